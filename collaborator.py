@@ -9,7 +9,6 @@ import sys
 import os
 import time
 import argparse
-import statistics
 import threading
 import urllib.request
 from pathlib import Path
@@ -23,15 +22,21 @@ from config.manager import ConfigManager
 from video import get_video_driver
 from video.drivers.gst_driver import get_pi_model
 from video.file_manager import VideoFileManager
-from networking.communication import CommandListener, SyncReceiver
+from networking.communication import CommandListener, SyncReceiver, UdpListenerLoop
 from networking.wifi_manager import handle_wifi_provision, start_collaborator_network_watchdog
 from core import SystemState, get_ntp_status
 from core.logger import log_info, log_error, log_warning, enable_system_logging
+from core.rolling_median import RollingMedian
+from core.timeline_fit import TimelineFit
 from core.node_common import (
     install_startup_crash_logger,
     message_targets_this_device,
     start_device_update,
     read_recent_log,
+    elevate_thread_priority,
+    pin_thread_to_cpu,
+    MIDI_CPU_SLOT,
+    SYNC_CPU_SLOT,
 )
 from ui.window_manager import hide_mouse_cursor
 
@@ -93,7 +98,8 @@ class CollaboratorPi:
             self.osc_handler = OscHandler()
             log_info("OSC: Initialized", component="collaborator")
 
-        # Initialize networking
+        # Initialize networking (both listeners share one selector thread)
+        self.net_loop = UdpListenerLoop()
         self.command_listener = CommandListener()
         self.sync_receiver = SyncReceiver(
             sync_port=self.config.getint("sync_port", 5005),
@@ -109,8 +115,8 @@ class CollaboratorPi:
         self.debug_sync_logging = self.config.debug_mode
         self.critical_window_logging = False
         self.debug_deviation_mode = False
-        self.deviation_samples = []
         self.max_samples = self.config.max_samples
+        self.deviation_samples = RollingMedian(self.max_samples)
         self.max_drift = self.config.max_drift
         self.min_drift = self.config.min_drift
         self.kp = self.config.kp
@@ -137,7 +143,16 @@ class CollaboratorPi:
         self._latest_sync_state = None
         self._sync_lock = threading.Lock()
         self._sync_thread = None
+        self._midi_thread = None
         self._stop_sync_thread = threading.Event()
+        # Set by _handle_sync (and stop_playback) to wake the processor early
+        self._sync_arrived = threading.Event()
+        # Smoothed leader timeline for MIDI cue timing (see _midi_clock)
+        self._leader_fit = TimelineFit()
+        self._fitted_state = None
+        # (received_at, leader time) of the newest tick: the MIDI clock's
+        # fallback while the fit warms up
+        self._midi_anchor: Optional[tuple] = None
         
         self.is_running = False
 
@@ -169,9 +184,10 @@ class CollaboratorPi:
             log_info("Node in BYSTANDER mode. Waiting for remote provisioning.", component="collaborator")
         else:
             log_info("Node in COLLABORATOR mode. Listening for sync...", component="collaborator")
-            self.sync_receiver.start_listening()
+            self.sync_receiver.start_listening(self.net_loop)
             
-        self.command_listener.start_listening()
+        self.command_listener.start_listening(self.net_loop)
+        self.net_loop.start()
         self.is_running = True
 
         # If venue WiFi hides the leader for a few minutes, drop back to the
@@ -184,6 +200,10 @@ class CollaboratorPi:
         except Exception as e:
             log_warning(f"Network watchdog unavailable: {e}", component="collaborator")
 
+        # Heartbeats run on a fixed monotonic deadline (sync and commands are
+        # served by net_loop), so the send work below doesn't stretch the
+        # 2s period and wall-clock steps can't bunch or stall them.
+        next_heartbeat = time.monotonic()
         try:
             while self.is_running:
                 # Send heartbeat with current role and status
@@ -220,8 +240,10 @@ class CollaboratorPi:
                     )
                 except Exception as e:
                     log_warning(f"Failed to send heartbeat: {e}", component="collaborator")
-                    
-                time.sleep(2)
+
+                # Skip missed slots (e.g. after a stall) rather than bursting
+                next_heartbeat = max(next_heartbeat + 2.0, time.monotonic())
+                time.sleep(max(0.0, next_heartbeat - time.monotonic()))
         except KeyboardInterrupt:
             self.cleanup()
         except Exception as e:
@@ -521,14 +543,59 @@ class CollaboratorPi:
             return
         with self._sync_lock:
             self._latest_sync_state = (leader_time, received_at, sent_at, source, position_read_time)
+        self._sync_arrived.set()
 
     def _sync_processor_loop(self) -> None:
-        while not self._stop_sync_thread.is_set():
+        # Drives rate correction. Waits at most 10ms per tick, but a fresh
+        # sync packet (or stop) wakes it immediately. MIDI runs on its own
+        # thread (_midi_cue_loop) so a blocking seek here can't delay a cue.
+        elevate_thread_priority(component="collaborator")
+        pin_thread_to_cpu("collaborator", SYNC_CPU_SLOT)
+        # Bound once: this loop runs up to ~100x/s for the whole session
+        stopped = self._stop_sync_thread.is_set
+        process_tick = self._process_sync_tick
+        arrived = self._sync_arrived
+        while not stopped():
             try:
-                self._process_sync_tick()
+                process_tick()
             except Exception as e:
                 log_error(f"Sync error: {e}")
-            time.sleep(0.01)
+            arrived.wait(0.01)
+            arrived.clear()
+
+    def _midi_clock(self, now: float) -> Optional[float]:
+        """Leader time for MIDI cues at local wall time `now`.
+
+        The fitted line once it has warmed up, else the newest tick
+        extrapolated; None before the first tick of the session.
+        """
+        cue_time = self._leader_fit.predict(now)
+        if cue_time is not None:
+            return cue_time
+        anchor = self._midi_anchor
+        if anchor is None:
+            return None
+        received_at, leader_time = anchor
+        return leader_time + max(0.0, now - received_at)
+
+    def _midi_cue_loop(self) -> None:
+        # Like the leader's cue loop: sleep until the next cue is due, read
+        # the clock, fire. Only reads the fit and the anchor, both of which
+        # the sync thread publishes as whole objects.
+        elevate_thread_priority(component="midi")
+        pin_thread_to_cpu("midi", MIDI_CPU_SLOT)
+        scheduler = self.midi_scheduler
+        stop = self._stop_sync_thread
+        while not stop.is_set():
+            wait = scheduler.MAX_IDLE_WAIT
+            midi_time = self._midi_clock(time.time())
+            if midi_time is not None:
+                try:
+                    scheduler.process_cues(midi_time)
+                except Exception as e:
+                    log_error(f"MIDI cue error: {e}", component="midi")
+                wait = scheduler.next_wait(midi_time)
+            stop.wait(max(wait, 0.001))
 
     def _process_sync_tick(self) -> None:
         state = None
@@ -550,22 +617,32 @@ class CollaboratorPi:
                 leader_time, received_at, sent_at = state
                 source = "media"
                 adjusted_leader_time = leader_time
-            enable_compensation = getattr(self.config, "enable_latency_compensation", False)
-            if enable_compensation and self._smoothed_latency is not None:
-                adjusted_leader_time += self._smoothed_latency
+            smoothed_latency = self._smoothed_latency
+            if smoothed_latency is not None and getattr(self.config, "enable_latency_compensation", False):
+                adjusted_leader_time += smoothed_latency
+            # One clock read per tick, shared with _maintain_video_sync.
+            # Wall clock on purpose: received_at is a CLOCK_REALTIME kernel
+            # receive timestamp, so a monotonic "now" can't be compared to it.
+            now = time.time()
+            if self.midi_scheduler and state is not self._fitted_state:
+                # Each packet feeds the fit once; the line through the last
+                # TimelineFit window of ticks (32 x tick_interval, ~0.64s at
+                # the 0.02s default) keeps per-packet jitter off cue timing.
+                self._fitted_state = state
+                self._leader_fit.add(received_at, adjusted_leader_time)
+                self._midi_anchor = (received_at, adjusted_leader_time)
             # Account for time elapsed since packet arrived (processing lag)
-            adjusted_leader_time += max(0.0, time.time() - received_at)
+            adjusted_leader_time += max(0.0, now - received_at)
             self.system_state.current_time = adjusted_leader_time
-            if self.midi_scheduler:
-                self.midi_scheduler.process_cues(adjusted_leader_time)
             # Runs in BOTH sync modes: in netclock mode it measures/logs
             # deviation and acts only as a coarse divergence watchdog.
-            self._maintain_video_sync(adjusted_leader_time, source=source)
+            self._maintain_video_sync(adjusted_leader_time, source=source, now=now)
 
-    def _maintain_video_sync(self, leader_time: float, source: str = "media") -> None:
+    def _maintain_video_sync(self, leader_time: float, source: str = "media", now: Optional[float] = None) -> None:
         if not self.video_player.is_playing or getattr(self.video_player, "is_seeking", False):
             return
-        now = time.time()
+        if now is None:
+            now = time.time()
         if now < self._settle_until:
             return
         # Static per-device offset (seconds): positive delays this device
@@ -608,12 +685,10 @@ class CollaboratorPi:
                 if video_pos < 3.0 or video_pos > (duration - 3.0):
                     is_near_loop = True
 
-        self.deviation_samples.append(deviation)
-        if len(self.deviation_samples) > self.max_samples:
-            self.deviation_samples.pop(0)
+        self.deviation_samples.add(deviation)
 
         if len(self.deviation_samples) >= self.max_samples or self.startup_sync_count < self.FAST_SYNC_THRESHOLD:
-            median_dev = deviation if self.startup_sync_count < self.FAST_SYNC_THRESHOLD else statistics.median(self.deviation_samples)
+            median_dev = deviation if self.startup_sync_count < self.FAST_SYNC_THRESHOLD else self.deviation_samples.median()
             if self.startup_sync_count < self.FAST_SYNC_THRESHOLD: self.startup_sync_count += 1
 
             if getattr(self.config, "sync_mode", "udp") == "netclock":
@@ -774,16 +849,24 @@ class CollaboratorPi:
             self._netclock_fallback_warned = False
             self._last_hard_seek_at = 0.0
             self._stop_sync_thread.clear()
+            self._leader_fit.reset()
+            self._midi_anchor = None
             self._sync_thread = threading.Thread(target=self._sync_processor_loop, daemon=True)
             self._sync_thread.start()
             if self.midi_scheduler:
                 self.midi_scheduler.start_playback(self.system_state.start_time, self.video_player.get_duration())
+                self._midi_thread = threading.Thread(target=self._midi_cue_loop, daemon=True)
+                self._midi_thread.start()
 
     def stop_playback(self) -> None:
         self._stop_sync_thread.set()
+        self._sync_arrived.set()
         if self._sync_thread:
             self._sync_thread.join(timeout=1.0)
             self._sync_thread = None
+        if self._midi_thread:
+            self._midi_thread.join(timeout=1.0)
+            self._midi_thread = None
         self.video_player.stop()
         self._play_start_wall = None
         if self.midi_scheduler:
@@ -794,6 +877,7 @@ class CollaboratorPi:
         self.is_running = False
         self.sync_receiver.stop_listening()
         self.command_listener.stop_listening()
+        self.net_loop.stop()
         self.stop_playback()
         self.video_player.cleanup()
         if self.midi_manager: self.midi_manager.cleanup()
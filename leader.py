@@ -4,7 +4,6 @@ kSync Leader - Main entry point for the Leader role.
 Coordinates playback, broadcasts time sync, and manages collaborators.
 """
 
-import json
 import sys
 import os
 import socket
@@ -13,7 +12,7 @@ import time
 import argparse
 import signal
 from pathlib import Path
-from typing import Any
+from typing import Any, Optional
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent / "src"))
@@ -22,7 +21,7 @@ from config.manager import ConfigManager
 from video import get_video_driver
 from video.drivers.gst_driver import get_pi_model
 from video.file_manager import VideoFileManager
-from networking.communication import SyncBroadcaster, CommandManager
+from networking.communication import SyncBroadcaster, CommandManager, encode_json
 from networking.wifi_manager import WifiManager, start_leader_network_watchdog
 from networking.captive_portal import CaptivePortalServer, WifiProvisioner
 from core.schedule import Schedule
@@ -33,6 +32,9 @@ from core.node_common import (
     message_targets_this_device,
     start_device_update,
     read_recent_log,
+    elevate_thread_priority,
+    pin_thread_to_cpu,
+    MIDI_CPU_SLOT,
 )
 from ui.interface import CommandInterface, StatusDisplay
 from ui.window_manager import hide_mouse_cursor
@@ -61,6 +63,8 @@ class LeaderPi:
 
         # Core Components
         self.system_state = SystemState()
+        # Set on stop; replaced by start_system() for every session
+        self._session_stop: Optional[threading.Event] = None
         self.video_manager = VideoFileManager(self.config.video_file, self.config.usb_mount_point)
         self.schedule = Schedule(self.config.schedule_file)
 
@@ -185,7 +189,7 @@ class LeaderPi:
         """Send a UDP message directly to a specific host (no broadcast)."""
         try:
             self.command_manager._ensure_send_socket()
-            data = json.dumps(payload).encode()
+            data = encode_json(payload)
             self.command_manager.control_sock.sendto(data, (host, self.command_manager.control_port))
             log_info(f"Unicast: sent {payload.get('type')} to {host}", component="leader")
         except Exception as e:
@@ -251,6 +255,11 @@ class LeaderPi:
 
         # Start system state
         self.system_state.start_session()
+        # Per-session stop signal for this session's background loops; a new
+        # event each start, so a loop from the previous session can't see
+        # is_running flip back to True and carry on alongside the new one
+        session_stop = threading.Event()
+        self._session_stop = session_stop
 
         # Load schedule
         if self.midi_scheduler:
@@ -286,6 +295,7 @@ class LeaderPi:
         self.sync_broadcaster.set_duration_provider(self.video_player.get_duration)
         self.sync_broadcaster.leader_id = self.config.device_id
         self.sync_broadcaster.is_wall_clock = "fakesink" in self.video_driver_name or "mock" in self.video_driver_name
+        self.sync_broadcaster.wire_format = getattr(self.config, "sync_wire_format", "json")
         peer_ip = (self.config.get("sync_peer_ip", "") or "").strip()
         if peer_ip and self._ip_is_local(peer_ip):
             log_error(
@@ -333,31 +343,37 @@ class LeaderPi:
             self.command_manager.send_command(build_start_command())
 
             # Then much slower re-broadcast for late joiners (every 30s instead of 10s)
-            while self.system_state.is_running:
-                time.sleep(30.0)
+            while not session_stop.wait(30.0):
                 if self.system_state.is_running:
                     # Only broadcast (don't send direct to everyone again to reduce noise)
                     try:
                         self.command_manager._ensure_send_socket()
-                        payload = json.dumps(build_start_command())
+                        payload = encode_json(build_start_command())
                         self.command_manager.control_sock.sendto(
-                            payload.encode(), (self.command_manager.broadcast_ip, self.command_manager.control_port)
+                            payload, (self.command_manager.broadcast_ip, self.command_manager.control_port)
                         )
                     except Exception as e:
                         log_warning(f"Re-broadcast failed: {e}", component="leader")
 
         threading.Thread(target=start_broadcast_loop, daemon=True).start()
 
-        # MIDI processing loop
-        def midi_cue_loop():
-            while self.system_state.is_running and self.midi_scheduler:
+        # MIDI processing loop: sleep until the next cue is due rather than
+        # polling every 20ms. The stop event wakes it immediately on stop so a
+        # quick restart can't leave two loops running.
+        def midi_cue_loop(stop_event: threading.Event):
+            scheduler = self.midi_scheduler
+            elevate_thread_priority(component="midi")
+            pin_thread_to_cpu("midi", MIDI_CPU_SLOT)
+            while self.system_state.is_running and not stop_event.is_set():
+                wait = scheduler.MAX_IDLE_WAIT
                 current_time = self.video_player.get_position()
                 if current_time is not None:
-                    self.midi_scheduler.process_cues(current_time)
-                time.sleep(0.02)
+                    scheduler.process_cues(current_time)
+                    wait = scheduler.next_wait(current_time)
+                stop_event.wait(max(wait, 0.001))
 
         if self.midi_scheduler:
-            threading.Thread(target=midi_cue_loop, daemon=True).start()
+            threading.Thread(target=midi_cue_loop, args=(session_stop,), daemon=True).start()
 
         log_info("System started successfully!", component="leader")
 
@@ -369,6 +385,8 @@ class LeaderPi:
         log_info("Stopping kSync system...", component="leader")
         self.video_player.stop()
         self.sync_broadcaster.stop_broadcasting()
+        if self._session_stop:
+            self._session_stop.set()
         if self.midi_scheduler:
             self.midi_scheduler.stop_playback()
         self.system_state.stop_session()
@@ -122,6 +122,9 @@ ExecStartPre=$INSTALL_DIR/tools/start_x.sh
 ExecStart=$VENV_PYTHON kitchensync.py
 Restart=always
 RestartSec=5
+# Lets the unprivileged service user put the MIDI-cue / sync-tick threads on
+# SCHED_FIFO (core/node_common.py elevate_thread_priority)
+LimitRTPRIO=10
 
 [Install]
 WantedBy=multi-user.target
@@ -5,11 +5,12 @@ Handles loading and managing configuration from various sources
 """
 
 import configparser
+import functools
 import os
-import subprocess
 from typing import Optional, Dict, Any
 
 from core.logger import log_info, log_warning, log_error
+from core.mount_table import usb_mount_points
 
 
 # The config is UNIFIED: every key lives in the single [KITCHENSYNC] section.
@@ -23,7 +24,7 @@ CONFIG_ROLE_KEYS = {
         "video_file", "schedule_file", "video_driver", "sync_port", "tick_interval",
         "max_drift", "min_drift", "kp", "min_rate", "max_rate", "max_samples",
         "video_width", "video_height", "position_poll_interval", "remote_sync_mode",
-        "emulated_render_lag", "sync_peer_ip", "sync_mode",
+        "emulated_render_lag", "sync_peer_ip", "sync_mode", "sync_wire_format",
         "enable_deviation_log", "netclock_max_drift", "netclock_port",
         "cluster_name", "hotspot_password", "wifi_ssid", "wifi_password",
     },
@@ -69,6 +70,7 @@ EDITABLE_CONFIG_FIELDS = {
         {"key": "sync_peer_ip", "type": "string", "label": "Sync Peer IP (Ethernet)", "default": "", "tooltip": "COLLABORATOR's IP for direct-cable unicast sync. Setting this DISABLES broadcast - leave empty on a normal router/switch network. Never set it to this device's own IP."},
         {"key": "enable_deviation_log", "type": "bool", "label": "Deviation CSV Log", "default": True, "tooltip": "Write per-tick sync deviation to logs/sync_deviation.csv (main diagnostic for sync quality)."},
         {"key": "sync_mode", "type": "choice", "label": "Sync Mode", "default": "udp", "options": ["udp", "netclock"], "tooltip": "udp: custom P-gain speed control. netclock: GStreamer native clock sync."},
+        {"key": "sync_wire_format", "type": "choice", "label": "Sync Packet Format", "default": "json", "options": ["json", "binary"], "tooltip": "json: readable by every release. binary: compact fixed-layout frame, cheaper to decode. Only switch to binary once every collaborator runs a release that accepts it."},
         {"key": "cluster_name", "type": "string", "label": "Cluster Name", "default": "ksync", "tooltip": "Names this installation's private WiFi (kSync-<name>). Use distinct names for separate installations in the same building."},
         {"key": "hotspot_password", "type": "string", "label": "Cluster WiFi Password", "default": "kitchensync", "tooltip": "WPA2 password for the leader-hosted kSync network (min 8 characters)."},
         {"key": "wifi_ssid", "type": "string", "label": "Venue WiFi SSID", "default": "", "tooltip": "Optional: join this existing WiFi network instead of hosting a private one. Leave empty for the self-hosted kSync network."},
@@ -104,6 +106,16 @@ EDITABLE_CONFIG_FIELDS = {
     ],
 }
 
+# Numeric keys, cast once when the config is (re)loaded instead of on every
+# getfloat/getint (tick_interval and the sync gains are read per tick)
+_CONFIG_SCHEMA = {
+    field["key"]: {"float": float, "int": int}[field["type"]]
+    for fields in EDITABLE_CONFIG_FIELDS.values()
+    for field in fields
+    if field["type"] in ("float", "int")
+}
+
+
 class ConfigurationError(Exception):
     """Raised when configuration loading fails"""
     pass
@@ -115,22 +127,7 @@ class USBConfigLoader:
     @staticmethod
     def find_usb_mount_points() -> list[str]:
         """Find all mounted USB drives"""
-        mount_points = []
-        try:
-            mount_result = subprocess.run(["mount"], capture_output=True, text=True)
-            if mount_result.returncode == 0:
-                for line in mount_result.stdout.split("\n"):
-                    if "/media/" in line and (
-                        "usb" in line.lower() or "sd" in line or "mmc" in line
-                    ):
-                        parts = line.split(" on ")
-                        if len(parts) >= 2:
-                            mount_point = parts[1].split(" type ")[0]
-                            if os.path.exists(mount_point) and os.path.isdir(mount_point):
-                                mount_points.append(mount_point)
-        except Exception as e:
-            print(f"Error checking USB drives: {e}")
-        return mount_points
+        return usb_mount_points()
 
     @staticmethod
     def find_config_on_usb() -> Optional[str]:
@@ -154,14 +151,14 @@ class USBConfigLoader:
     @staticmethod
     def find_video_on_usb() -> Optional[Dict[str, str]]:
         """Find a video file on USB drives"""
-        video_extensions = [".mp4", ".mov", ".mkv"]
+        video_extensions = (".mp4", ".mov", ".mkv")  # tuple: one C-level endswith
         for mount_point in USBConfigLoader.find_usb_mount_points():
             for root, dirs, files in os.walk(mount_point):
                 depth = root[len(mount_point):].count(os.sep)
                 if depth >= 1:
                     dirs.clear()
                 for file in files:
-                    if any(file.lower().endswith(ext) for ext in video_extensions):
+                    if file.lower().endswith(video_extensions):
                         video_path = os.path.join(root, file)
                         log_info(f"Found video on USB: {video_path}", component="config")
                         return {"mount_point": mount_point, "video_file": file}
@@ -170,25 +167,63 @@ class USBConfigLoader:
     @staticmethod
     def find_schedule_on_usb() -> Optional[str]:
         """Find a MIDI schedule file on USB drives"""
-        schedule_files = ["schedule.json", "midi_schedule.json", "relay_schedule.json"]
+        schedule_files = {"schedule.json", "midi_schedule.json", "relay_schedule.json"}
         for mount_point in USBConfigLoader.find_usb_mount_points():
             for root, dirs, files in os.walk(mount_point):
                 depth = root[len(mount_point):].count(os.sep)
                 if depth >= 1:
                     dirs.clear()
                 for file in files:
-                    if file.lower() in [sf.lower() for sf in schedule_files]:
+                    if file.lower() in schedule_files:
                         schedule_path = os.path.join(root, file)
                         log_info(f"Found schedule on USB: {schedule_path}", component="config")
                         return schedule_path
         return None
 
 
+def _new_parser() -> configparser.ConfigParser:
+    """ConfigParser for ksync.ini files.
+
+    Interpolation is off: no key uses %(name)s references, and with it on a
+    literal '%' (common in WiFi/hotspot passwords) could neither be saved
+    nor read back - get() swallowed the error and returned the default.
+    """
+    return configparser.ConfigParser(interpolation=None)
+
+
+@functools.lru_cache(maxsize=1)
+def _hardware_id() -> Optional[str]:
+    """Board serial (last 6 hex digits), else the MAC; read once per process.
+
+    device_id falls back to this whenever the configured id is a default,
+    and device_id is read for every heartbeat and targeted command.
+    """
+    try:
+        with open("/proc/cpuinfo", "r") as f:
+            for line in f:
+                if line.startswith("Serial"):
+                    s = line.split(":")[1].strip()
+                    if s and s != "0000000000000000": return s[-6:]
+    except: pass
+    try:
+        import uuid
+        m = hex(uuid.getnode())[2:]
+        if m: return m[-6:]
+    except: pass
+    return None
+
+
 class ConfigManager:
     """Central configuration manager for kSync"""
 
     def __init__(self, config_file: Optional[str] = None):
-        self.config = configparser.ConfigParser()
+        self.config = _new_parser()
+        # Flattened [KITCHENSYNC]-over-[DEFAULT] view that get() reads from;
+        # rebuilt by _refresh_values() whenever self.config changes.
+        self._values: Dict[str, str] = {}
+        # Schema keys from _values already cast to int/float, for the typed
+        # getters only; get() keeps returning the text as written
+        self._typed: Dict[str, Any] = {}
         self.config_file = config_file
         self.usb_config_path = None
         self._usb_mount_point = None
@@ -197,6 +232,32 @@ class ConfigManager:
 
     def load_configuration(self) -> None:
         """Load configuration from USB, file, or create defaults"""
+        self._load_sources()
+        self._refresh_values()
+
+    def _refresh_values(self) -> None:
+        """Snapshot the parser into the dict that get() serves.
+
+        Properties such as kp or sync_mode are read on every sync tick;
+        going through ConfigParser.get each time re-resolved the section
+        chain on every access. Numeric keys are also parsed here, once,
+        into the cache getfloat/getint serve.
+        """
+        if self.config.has_section("KITCHENSYNC"):
+            values = dict(self.config["KITCHENSYNC"])
+        else:
+            values = dict(self.config.defaults())
+        typed = {}
+        for key, caster in _CONFIG_SCHEMA.items():
+            if key in values:
+                try:
+                    typed[key] = caster(values[key])
+                except ValueError:
+                    pass  # the typed getters parse it and fall back to their default
+        self._values = values
+        self._typed = typed
+
+    def _load_sources(self) -> None:
         # 1. Try USB prioritize root (via USBConfigLoader)
         self.usb_config_path = USBConfigLoader.find_config_on_usb()
         if self.usb_config_path:
@@ -240,6 +301,7 @@ class ConfigManager:
             "audio_output": "hdmi",
             "crop_mode": "letterbox",
         }
+        self._refresh_values()
 
         if self.config_file and not os.path.exists(self.config_file):
             try:
@@ -250,6 +312,8 @@ class ConfigManager:
                 log_error(f"Could not write default config file: {e}", component="config")
 
     def get(self, key: str, default: Any = None, section: str = "KITCHENSYNC") -> Any:
+        if section == "KITCHENSYNC":
+            return self._values.get(key.lower(), default)
         try:
             if section in self.config and key in self.config[section]:
                 return self.config.get(section, key)
@@ -265,10 +329,16 @@ class ConfigManager:
         return str(val).lower() in ("true", "yes", "1", "on")
 
     def getint(self, key: str, default: int = 0, section: str = "KITCHENSYNC") -> int:
+        if section == "KITCHENSYNC":
+            value = self._typed.get(key.lower())
+            if type(value) is int: return value
         try: return int(self.get(key, default, section))
         except: return default
 
     def getfloat(self, key: str, default: float = 0.0, section: str = "KITCHENSYNC") -> float:
+        if section == "KITCHENSYNC":
+            value = self._typed.get(key.lower())
+            if type(value) is float: return value
         try: return float(self.get(key, default, section))
         except: return default
 
@@ -279,23 +349,31 @@ class ConfigManager:
         section is removed, so legacy two-section files converge to the
         unified layout and can never shadow an edit again.
         """
-        local_config = configparser.ConfigParser()
+        local_config = _new_parser()
         if os.path.exists(target_file):
             local_config.read(target_file)
 
+        changed = False
         if "KITCHENSYNC" not in local_config:
             local_config.add_section("KITCHENSYNC")
+            changed = True
 
         for key, value in updates.items():
-            local_config.set("KITCHENSYNC", key, str(value))
+            if local_config.get("KITCHENSYNC", key, fallback=None) != str(value):
+                local_config.set("KITCHENSYNC", key, str(value))
+                changed = True
             for other_section in local_config.sections():
                 if other_section != "KITCHENSYNC":
-                    local_config.remove_option(other_section, key)
+                    changed |= local_config.remove_option(other_section, key)
             try:
-                local_config.remove_option("DEFAULT", key)
+                changed |= local_config.remove_option("DEFAULT", key)
             except configparser.Error:
                 pass
 
+        # Every boot persists the same identity keys; skip the SD-card write
+        # (and the mtime bump) when the file already says exactly that.
+        if not changed:
+            return
         with open(target_file, "w") as f:
             local_config.write(f)
         log_info(f"Updated {target_file}", component="config")
@@ -338,7 +416,7 @@ class ConfigManager:
         """Rewrite the config as a single unified [KITCHENSYNC] section
         containing only the role's whitelisted keys."""
         role_name = role or self.role_name()
-        cleaned = configparser.ConfigParser()
+        cleaned = _new_parser()
         cleaned["KITCHENSYNC"] = {}
 
         # Determine if we are updating the current config
@@ -357,11 +435,13 @@ class ConfigManager:
 
         if is_current:
             self.config = cleaned
+            self._refresh_values()
 
     def set_param(self, key: str, value: Any) -> None:
         # Live update internal object
         if "KITCHENSYNC" not in self.config: self.config["KITCHENSYNC"] = {}
         self.config["KITCHENSYNC"][key] = str(value).lower() if isinstance(value, bool) else str(value)
+        self._refresh_values()
 
     @property
     def content_dir(self) -> str:
@@ -409,19 +489,7 @@ class ConfigManager:
         return cid
 
     def _get_hardware_id(self) -> Optional[str]:
-        try:
-            with open("/proc/cpuinfo", "r") as f:
-                for line in f:
-                    if line.startswith("Serial"):
-                        s = line.split(":")[1].strip()
-                        if s and s != "0000000000000000": return s[-6:]
-        except: pass
-        try:
-            import uuid
-            m = hex(uuid.getnode())[2:]
-            if m: return m[-6:]
-        except: pass
-        return None
+        return _hardware_id()
 
     @property
     def usb_mount_point(self) -> Optional[str]: return self._usb_mount_point
@@ -438,6 +506,11 @@ class ConfigManager:
     @property
     def sync_mode(self) -> str: return self.get("sync_mode", "udp")
 
+    @property
+    def sync_wire_format(self) -> str:
+        fmt = (self.get("sync_wire_format", "json") or "json").strip().lower()
+        return fmt if fmt in ("json", "binary") else "json"
+
     @property
     def max_drift(self) -> float: return self.getfloat("max_drift", 0.15)
 
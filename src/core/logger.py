@@ -83,6 +83,10 @@ def enable_system_logging(enabled: bool = True) -> None:
     global _ENABLE_SYSTEM_LOGGING
     _ENABLE_SYSTEM_LOGGING = enabled
 
+def info_logging_enabled() -> bool:
+    """True when log_info() would emit; lets hot paths skip building messages."""
+    return _ENABLE_SYSTEM_LOGGING
+
 def debug_log_info(message: str, component: str = "debug") -> None:
     log_info(message, component)
 
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""
+USB mount points from the kernel mount table.
+
+Config discovery and video discovery both ask which USB sticks are
+mounted, the latter on every find_video_file call. procfs flags an open
+mount table with POLLPRI whenever anything is mounted or unmounted, so
+one shared table parses /proc/mounts once and reuses the result until
+that happens.
+"""
+
+import os
+import re
+import select
+import subprocess
+import threading
+from typing import List, Optional
+
+PROC_MOUNTS = "/proc/mounts"
+
+
+def _unescape_mount_field(field: str) -> str:
+    return re.sub(r"\\([0-7]{3})", lambda m: chr(int(m.group(1), 8)), field)
+
+
+class MountTable:
+    """USB mount points, reused until the mount table changes.
+
+    Without procfs (or for a path outside /proc, as in tests) there is
+    nothing to watch and every call rescans.
+    """
+
+    def __init__(self, path: str = PROC_MOUNTS):
+        self.path = path
+        self._usb_mounts: Optional[List[str]] = None
+        self._watch = None
+        self._lock = threading.Lock()
+
+    def usb_mount_points(self) -> List[str]:
+        with self._lock:
+            if self._usb_mounts is not None and not self._changed():
+                return list(self._usb_mounts)
+            if self._watch is None and self.path.startswith("/proc/"):
+                try:
+                    # Opened before the scan so a mount racing it still flags
+                    self._watch = open(self.path, "rb")
+                except OSError:
+                    pass
+            mount_points = self._scan()
+            if self._watch is not None:
+                self._usb_mounts = mount_points
+            return list(mount_points)
+
+    def close(self) -> None:
+        with self._lock:
+            if self._watch is not None:
+                self._watch.close()
+                self._watch = None
+            self._usb_mounts = None
+
+    def _changed(self) -> bool:
+        """True if the mount table changed since the last check (consumes it)."""
+        if self._watch is None:
+            return True
+        try:
+            _, _, exceptional = select.select([], [], [self._watch], 0)
+        except (OSError, ValueError):
+            return True
+        return bool(exceptional)
+
+    def _scan(self) -> List[str]:
+        """Parse the mount table for USB mounts (uncached).
+
+        Reads the kernel mount table directly; forking `mount` cost more
+        than the lookup it feeds.
+        """
+        mount_points = []
+        try:
+            try:
+                with open(self.path, "r") as f:
+                    # "<device> <mount point> <type> ..."; spaces in the mount
+                    # point are octal-escaped (\040)
+                    entries = [
+                        (fields[0], _unescape_mount_field(fields[1]))
+                        for fields in (line.split() for line in f)
+                        if len(fields) >= 2
+                    ]
+            except OSError:
+                # No procfs (non-Linux dev machine): fall back to mount(8)
+                entries = []
+                mount_result = subprocess.run(["mount"], capture_output=True, text=True)
+                if mount_result.returncode == 0:
+                    for line in mount_result.stdout.split("\n"):
+                        parts = line.split(" on ")
+                        if len(parts) >= 2:
+                            entries.append((parts[0], parts[1].split(" type ")[0]))
+            for device, mount_point in entries:
+                line = f"{device} {mount_point}"
+                if "/media/" in line and (
+                    "usb" in line.lower() or "sd" in line or "mmc" in line
+                ):
+                    if os.path.isdir(mount_point):
+                        mount_points.append(mount_point)
+        except Exception:
+            pass  # Ignore USB mount errors
+        return mount_points
+
+
+# One table (one watch, one parse) for every caller in the process
+_shared_table = MountTable()
+
+
+def usb_mount_points() -> List[str]:
+    """Currently mounted USB drives."""
+    return _shared_table.usb_mount_points()
@@ -82,6 +82,65 @@ def start_device_update(component: str) -> None:
     threading.Thread(target=_do_update, daemon=True).start()
 
 
+# SCHED_FIFO priority for timing-critical loops (MIDI cues, sync tick). Low
+# on purpose: above every SCHED_OTHER thread, below kernel IRQ threads (50).
+# Unprivileged users need RLIMIT_RTPRIO >= this - the systemd unit written by
+# setup.sh sets LimitRTPRIO.
+REALTIME_LOOP_PRIORITY = 10
+
+
+def elevate_thread_priority(component: str, priority: int = REALTIME_LOOP_PRIORITY) -> bool:
+    """Best-effort move of the CALLING thread to SCHED_FIFO.
+
+    Cuts wakeup jitter for loops that sleep until a deadline. Only safe for
+    loops that spend most of their time asleep. Returns False (and changes
+    nothing) where unsupported or not permitted.
+    """
+    if not hasattr(os, "sched_setscheduler"):
+        return False
+    try:
+        # pid 0 = the calling thread on Linux (scheduling policy is per-task)
+        os.sched_setscheduler(0, os.SCHED_FIFO, os.sched_param(priority))
+    except (OSError, AttributeError) as e:
+        log_info(f"Realtime priority unavailable ({e}); staying SCHED_OTHER", component=component)
+        return False
+    log_info(f"Realtime priority: SCHED_FIFO {priority}", component=component)
+    return True
+
+
+# Cores counted back from the last one the process may use. MIDI (cue loops
+# and the writer) and the collaborator's sync loop each get their own, away
+# from CPU 0 where most IRQs and the desktop land. Only on 4+ cores (Pi 4/5):
+# pinning on a dual-core would crowd the decoder rather than isolate anything.
+MIDI_CPU_SLOT = 0
+SYNC_CPU_SLOT = 1
+MIN_CPUS_FOR_PINNING = 4
+
+
+def pin_thread_to_cpu(component: str, slot: int) -> Optional[int]:
+    """Best-effort pin of the CALLING thread to one core.
+
+    A waking timing loop otherwise lands on whichever core the scheduler
+    picks, often one busy with decode or the GIL holder's cache-hot work.
+    Returns the core, or None (and changes nothing) where unsupported,
+    not permitted, or on too few cores.
+    """
+    if not hasattr(os, "sched_setaffinity"):
+        return None
+    try:
+        allowed = sorted(os.sched_getaffinity(0))
+        if len(allowed) < MIN_CPUS_FOR_PINNING or slot >= len(allowed) - 1:
+            return None
+        cpu = allowed[-1 - slot]
+        # pid 0 = the calling thread, as with sched_setscheduler
+        os.sched_setaffinity(0, {cpu})
+    except (OSError, AttributeError) as e:
+        log_info(f"CPU pinning unavailable ({e})", component=component)
+        return None
+    log_info(f"Pinned to CPU {cpu}", component=component)
+    return cpu
+
+
 def read_recent_log(max_lines: int = 100, max_chars: int = 30000, missing_note: str = "No log file found.") -> str:
     """Tail the system log for log_request replies, capped to avoid UDP
     datagram truncation (incident 1a57a01)."""
@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Median over a sliding window of samples.
+
+The collaborator's drift filter takes the median of its last few deviation
+samples on every sync tick. statistics.median copies and sorts the window
+each call; keeping the window sorted as samples arrive makes the query an
+index lookup.
+"""
+
+import bisect
+
+
+class RollingMedian:
+    """Median of the last `window` samples.
+
+    Samples live in a preallocated ring (write index, no per-sample
+    container growth) mirrored by a sorted list. add() is one bisect
+    removal of the overwritten sample plus one bisect insert; median()
+    matches statistics.median (mean of the middle pair for an even count)
+    without copying or sorting.
+    """
+
+    def __init__(self, window: int):
+        self.window = max(1, int(window))
+        self._ring = [0.0] * self.window
+        self._next = 0  # ring slot the next sample overwrites
+        self._sorted: list = []
+
+    def __len__(self) -> int:
+        return len(self._sorted)
+
+    def add(self, value: float) -> None:
+        if len(self._sorted) == self.window:
+            del self._sorted[bisect.bisect_left(self._sorted, self._ring[self._next])]
+        self._ring[self._next] = value
+        self._next = (self._next + 1) % self.window
+        bisect.insort(self._sorted, value)
+
+    def median(self) -> float:
+        n = len(self._sorted)
+        if n == 0:
+            raise ValueError("median of an empty window")
+        mid = n // 2
+        if n % 2:
+            return self._sorted[mid]
+        return (self._sorted[mid - 1] + self._sorted[mid]) / 2
+
+    def clear(self) -> None:
+        self._next = 0
+        self._sorted.clear()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""
+Least-squares fit of the leader's timeline against the local clock.
+
+Each sync tick pairs a local receive time with the leader position it
+carried. Extrapolating from only the newest tick passes that tick's network
+jitter straight through; a line fitted over the last few dozen ticks averages
+it out and also absorbs clock skew between the two machines.
+"""
+
+from collections import deque
+from typing import Optional
+
+
+class TimelineFit:
+    """Sliding-window linear fit of remote time as a function of local time.
+
+    predict() returns None until MIN_SAMPLES points are in, so callers keep
+    their raw estimate during warm-up. A sample further than jump_threshold
+    from the current prediction (loop wrap, seek, pause) restarts the fit.
+
+    add() and predict() may run on different threads: the fitted line is
+    published as one tuple, so a reader never sees half of a refit.
+    """
+
+    MIN_SAMPLES = 3
+
+    def __init__(self, window: int = 32, jump_threshold: float = 0.25):
+        self.jump_threshold = jump_threshold
+        self._samples: deque = deque(maxlen=window)
+        self._origin = 0.0  # local time of the first sample, keeps x small
+        # (origin, intercept, slope) once MIN_SAMPLES are in, else None
+        self._line: Optional[tuple] = None
+
+    def reset(self) -> None:
+        self._line = None
+        self._samples.clear()
+
+    def add(self, local_time: float, remote_time: float) -> None:
+        predicted = self.predict(local_time)
+        if predicted is not None and abs(remote_time - predicted) > self.jump_threshold:
+            self.reset()
+        if not self._samples:
+            self._origin = local_time
+        self._samples.append((local_time - self._origin, remote_time))
+        if len(self._samples) >= self.MIN_SAMPLES:
+            self._refit()
+
+    def predict(self, local_time: float) -> Optional[float]:
+        line = self._line
+        if line is None:
+            return None
+        origin, intercept, slope = line
+        return intercept + slope * (local_time - origin)
+
+    def _refit(self) -> None:
+        n = len(self._samples)
+        mean_x = sum(x for x, _ in self._samples) / n
+        mean_y = sum(y for _, y in self._samples) / n
+        sxx = sxy = 0.0
+        for x, y in self._samples:
+            dx = x - mean_x
+            sxx += dx * dx
+            sxy += dx * (y - mean_y)
+        # Identical receive stamps give no slope information; assume 1:1
+        slope = sxy / sxx if sxx > 1e-12 else 1.0
+        self._line = (self._origin, mean_y - slope * mean_x, slope)
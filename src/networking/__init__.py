@@ -1,7 +1,8 @@
 """Networking package for kSync"""
 
 from .communication import (
-    SyncBroadcaster, SyncReceiver, CommandManager, CommandListener, NetworkError
+    SyncBroadcaster, SyncReceiver, CommandManager, CommandListener, NetworkError,
+    UdpListenerLoop,
 )
 from .wifi_manager import (
     WifiManager, ensure_network, cluster_ssid, handle_wifi_provision,
@@ -10,6 +11,7 @@ from .wifi_manager import (
 
 __all__ = [
     'SyncBroadcaster', 'SyncReceiver', 'CommandManager', 'CommandListener', 'NetworkError',
+    'UdpListenerLoop',
     'WifiManager', 'ensure_network', 'cluster_ssid', 'handle_wifi_provision',
     'start_leader_network_watchdog', 'start_collaborator_network_watchdog',
 ]
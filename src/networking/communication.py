@@ -4,16 +4,155 @@ Networking Components for kSync
 Handles time sync and command communication between leader and collaborators
 """
 
+import functools
 import json
+import math
+import selectors
 import socket
 import struct
 import threading
 import time
 from typing import Callable, Optional, Dict, Any
-from core.logger import log_info, log_warning
+from core.logger import info_logging_enabled, log_info, log_warning
+from networking.recvmmsg import RECVMMSG_AVAILABLE, RecvMmsgBatch
+
+# Optional fast JSON codec (C, works on bytes directly)
+try:
+    import orjson
+
+    ORJSON_AVAILABLE = True
+except ImportError:
+    ORJSON_AVAILABLE = False
 
 
 UDP_MAX_DATAGRAM_SIZE = 65535
+# Requested receive buffer for command sockets: room for several full-size
+# start commands (MIDI schedule inline) arriving as direct + broadcast copies.
+# Best effort - the kernel caps it at net.core.rmem_max.
+CONTROL_RCVBUF_BYTES = 1 << 20
+# Sync sockets only ever use the newest datagram, so a deep queue is just
+# stale ticks; this covers a few seconds of them during a GC or I/O stall.
+SYNC_RCVBUF_BYTES = 128 * 1024
+# DSCP EF (expedited forwarding) in the IP TOS byte. WiFi maps it to a WMM
+# voice/video access category, so ticks and probes skip the best-effort
+# queue that bulk traffic (video downloads, rsync) fills. Sync and the
+# latency probes are marked alike: RTT/2 must describe the path ticks take.
+LOW_DELAY_TOS = 0xB8
+
+
+def _mark_low_delay(sock: socket.socket) -> None:
+    """Best-effort DSCP EF marking for a kSync send socket."""
+    try:
+        sock.setsockopt(socket.IPPROTO_IP, socket.IP_TOS, LOW_DELAY_TOS)
+    except (OSError, AttributeError):
+        pass
+
+
+def decode_json(data) -> Any:
+    """Decode a JSON datagram, with orjson when it is installed.
+
+    orjson is stricter than the stdlib (no NaN/Infinity, 64-bit ints), and
+    stdlib json.dumps emits NaN for e.g. an undefined deviation - so a
+    rejected payload falls back to json.loads rather than being dropped.
+    Raises json.JSONDecodeError / UnicodeDecodeError like json.loads.
+    A memoryview over a receive buffer is accepted; orjson parses it in
+    place, the stdlib path copies it first.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def encode_json(message: Any) -> bytes:
+    """Encode an outgoing control message, with orjson when it is installed.
+
+    orjson returns bytes directly (no str round-trip). It writes NaN and
+    Infinity as null; anything it can't serialize at all (non-str keys,
+    >64-bit ints) is encoded by json.dumps instead.
+    """
+    if ORJSON_AVAILABLE:
+        try:
+            return orjson.dumps(message)
+        except orjson.JSONEncodeError:
+            pass
+    return json.dumps(message).encode()
+
+# Binary sync frame (sync_wire_format = binary). Fixed header, then the UTF-8
+# leader_id as the tail: magic, version, flags, time, duration, sent_at,
+# position_read_time. JSON sync datagrams start with "{", so the magic can't
+# collide and receivers accept both formats during a fleet upgrade.
+SYNC_FRAME_MAGIC = b"KS"
+SYNC_FRAME_VERSION = 1
+_SYNC_FRAME = struct.Struct("<2sBBdddd")
+_SYNC_FLAG_MEDIA = 0x01
+_SYNC_FLAG_HAS_DURATION = 0x02
+
+# JSON sync datagrams lead with their type key (stdlib or compact separators),
+# so anything else on the sync port is dropped before paying for a parse.
+_JSON_SYNC_PREFIXES = (b'{"type": "sync"', b'{"type":"sync"')
+
+# Every control message is one JSON object. Stray traffic on the control
+# port (binary sync frames, scanners, other apps' discovery broadcasts) is
+# dropped on its first byte instead of going through a failed parse.
+_JSON_OBJECT_START = b"{"
+
+
+# The leader_id tail is the same on every tick; encoding (sender) and
+# decoding (receiver) it once leaves one struct call per frame on each side.
+@functools.lru_cache(maxsize=16)
+def _encode_leader_id(leader_id: str) -> bytes:
+    return leader_id.encode()
+
+
+@functools.lru_cache(maxsize=16)
+def _decode_leader_id(tail: bytes) -> str:
+    return tail.decode(errors="replace") or "unknown"
+
+
+def pack_sync_frame(
+    leader_time: float,
+    leader_id: str,
+    source: str,
+    duration: Optional[float],
+    sent_at: float,
+    position_read_time: float,
+) -> bytes:
+    """Encode a sync tick as a binary frame (see _SYNC_FRAME)."""
+    flags = 0
+    if source == "media":
+        flags |= _SYNC_FLAG_MEDIA
+    if duration is not None:
+        flags |= _SYNC_FLAG_HAS_DURATION
+    return _SYNC_FRAME.pack(
+        SYNC_FRAME_MAGIC, SYNC_FRAME_VERSION, flags,
+        leader_time, duration or 0.0, sent_at, position_read_time,
+    ) + _encode_leader_id(leader_id)
+
+
+def unpack_sync_frame(data: bytes) -> Optional[tuple]:
+    """Decode a binary sync frame.
+
+    Returns (time, leader_id, source, duration, sent_at, position_read_time),
+    or None when data is not a frame this version understands.
+    """
+    if len(data) < _SYNC_FRAME.size or data[:2] != SYNC_FRAME_MAGIC:
+        return None
+    _magic, version, flags, leader_time, duration, sent_at, position_read_time = _SYNC_FRAME.unpack_from(data)
+    if version != SYNC_FRAME_VERSION:
+        return None
+    return (
+        leader_time,
+        _decode_leader_id(bytes(data[_SYNC_FRAME.size:])),
+        "media" if flags & _SYNC_FLAG_MEDIA else "wall",
+        duration if flags & _SYNC_FLAG_HAS_DURATION else None,
+        sent_at,
+        position_read_time,
+    )
 
 
 class NetworkError(Exception):
@@ -22,15 +161,21 @@ class NetworkError(Exception):
     pass
 
 
+def get_local_ip() -> str:
+    """IP of the interface the default route leaves through.
+
+    A UDP connect() only selects a route, nothing is sent. Raises OSError
+    when there is no route.
+    """
+    with socket.socket(socket.AF_INET, socket.SOCK_DGRAM) as s:
+        s.connect(("8.8.8.8", 80))
+        return s.getsockname()[0]
+
+
 def _get_broadcast_address():
     """Get appropriate broadcast address, prioritizing local subnet broadcast"""
     try:
-        # Get local IP to determine network
-        s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        # Doesn't need to connect, just needs to pick an interface
-        s.connect(("8.8.8.8", 80))
-        local_ip = s.getsockname()[0]
-        s.close()
+        local_ip = get_local_ip()
 
         # Calculate broadcast for common /24 network
         ip_parts = local_ip.split(".")
@@ -40,14 +185,10 @@ def _get_broadcast_address():
     except Exception:
         pass
 
-    # Fallback: Try standard broadcast
-    try:
-        test_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-        test_sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
-        test_sock.close()
-        return "255.255.255.255"
-    except Exception:
-        return "192.168.1.255" # Final sane default
+    # No route (cable out, WiFi still joining): limited broadcast. The old
+    # throwaway SO_BROADCAST probe socket could not fail here, and while
+    # offline every failed heartbeat re-resolved this address.
+    return "255.255.255.255"
 
 
 class SyncBroadcaster:
@@ -74,12 +215,52 @@ class SyncBroadcaster:
         # compare wall-clock position against its own hardware-decoded position
         # (which has ~400ms pipeline delay).
         self.is_wall_clock: bool = False
+        # "json" or "binary" (see pack_sync_frame); the leader sets this from
+        # sync_wire_format
+        self.wire_format = "json"
+        # JSON tick template: the leader_id/source/duration middle section,
+        # re-encoded only when one of them changes
+        self._json_static_key = None
+        self._json_static = ""
+
+    def _encode_json_tick(
+        self, current_time: float, time_source: str, duration: Optional[float],
+        sent_at: float, position_read_time: float,
+    ) -> bytes:
+        """Encode a JSON sync tick, formatting only the three live floats.
+
+        Output matches json.dumps of the equivalent dict, "type" first (the
+        collaborator's sync-port prefix filter relies on it). Non-float or
+        non-finite times take the plain json.dumps path.
+        """
+        if not all(type(v) is float and math.isfinite(v) for v in (current_time, sent_at, position_read_time)):
+            return json.dumps({
+                "type": "sync",
+                "time": current_time,
+                "leader_id": self.leader_id,
+                "source": time_source,
+                "duration": duration,
+                "sent_at": sent_at,
+                "position_read_time": position_read_time,
+            }).encode()
+
+        key = (self.leader_id, time_source, duration)
+        if key != self._json_static_key:
+            self._json_static_key = key
+            self._json_static = json.dumps(
+                {"leader_id": self.leader_id, "source": time_source, "duration": duration}
+            )[1:-1]
+        return (
+            f'{{"type": "sync", "time": {current_time!r}, {self._json_static}, '
+            f'"sent_at": {sent_at!r}, "position_read_time": {position_read_time!r}}}'
+        ).encode()
 
     def setup_socket(self) -> None:
         """Initialize broadcast socket"""
         try:
             self.sync_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.sync_sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            _mark_low_delay(self.sync_sock)
         except Exception as e:
             raise NetworkError(f"Failed to setup sync socket: {e}")
 
@@ -91,6 +272,9 @@ class SyncBroadcaster:
     def start_broadcasting(self, start_time: float) -> None:
         """Start broadcasting time sync"""
         self.start_time = start_time
+        # Wall-source ticks count from a monotonic anchor so a clock step on
+        # the leader doesn't jump the timeline every collaborator follows
+        self._start_monotonic = time.monotonic() - (time.time() - start_time)
         self.is_running = True
 
         if not self.sync_sock:
@@ -120,7 +304,7 @@ class SyncBroadcaster:
                                     time_source = "media"
                         
                         if current_time is None:
-                            current_time = time.time() - self.start_time
+                            current_time = time.monotonic() - self._start_monotonic
                             time_source = "wall"
 
                         # Include optional duration for diagnostics
@@ -132,25 +316,24 @@ class SyncBroadcaster:
                                 pass
 
                         now = time.time()
-                        payload = json.dumps(
-                            {
-                                "type": "sync",
-                                "time": current_time,
-                                "leader_id": self.leader_id,
-                                "source": time_source,
-                                "duration": leader_duration,
-                                "sent_at": now,
-                                "position_read_time": position_read_time or now,
-                            }
-                        )
+                        if self.wire_format == "binary":
+                            payload = pack_sync_frame(
+                                current_time, self.leader_id, time_source,
+                                leader_duration, now, position_read_time or now,
+                            )
+                        else:
+                            payload = self._encode_json_tick(
+                                current_time, time_source, leader_duration,
+                                now, position_read_time or now,
+                            )
 
                         if use_bcast:
                             self.sync_sock.sendto(
-                                payload.encode(), (self.broadcast_ip, self.sync_port)
+                                payload, (self.broadcast_ip, self.sync_port)
                             )
                         for target in targets:
                             self.sync_sock.sendto(
-                                payload.encode(), (target, self.sync_port)
+                                payload, (target, self.sync_port)
                             )
                     except Exception as e:
                         # Rate-limited: silence here once hid a dead unicast
@@ -205,15 +388,105 @@ def _extract_kernel_timestamp(ancdata) -> Optional[float]:
     return None
 
 
+class UdpListenerLoop:
+    """Serve several UDP listeners from a single selector thread.
+
+    Collaborators used to run one blocking recv thread per socket (sync and
+    commands): two stacks contending for the GIL and two wakeups per burst.
+    Listeners now register their socket with a read handler and one epoll
+    wait covers both. Handlers should not block for long - sync datagrams
+    queue in the kernel meanwhile, and SyncReceiver's drain-to-newest plus
+    kernel receive timestamps keep their timing honest when it catches up.
+
+    With no select_timeout the wait is unbounded: stop() wakes the loop
+    through a socketpair, so an idle node doesn't poll twice a second just
+    to notice shutdown.
+    """
+
+    def __init__(self, select_timeout: Optional[float] = None):
+        self.select_timeout = select_timeout
+        self.is_running = False
+        self._selector = selectors.DefaultSelector()
+        self._thread: Optional[threading.Thread] = None
+        self._wake_recv, self._wake_send = socket.socketpair()
+        self.register(self._wake_recv, self._drain_wakeups)
+        self._wake_send.setblocking(False)
+
+    def _drain_wakeups(self) -> None:
+        try:
+            while self._wake_recv.recv(64):
+                pass
+        except (BlockingIOError, OSError):
+            pass
+
+    def register(self, sock: socket.socket, handler: Callable[[], None]) -> None:
+        """Call handler() from the loop thread whenever sock is readable."""
+        sock.setblocking(False)
+        self._selector.register(sock, selectors.EVENT_READ, handler)
+
+    def unregister(self, sock: socket.socket) -> None:
+        try:
+            self._selector.unregister(sock)
+        except (KeyError, ValueError, OSError):
+            pass
+
+    def start(self) -> None:
+        if self.is_running:
+            return
+        self.is_running = True
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.is_running = False
+        try:
+            self._wake_send.send(b"\0")
+        except OSError:
+            pass  # already closed, or a wakeup is already pending
+        if self._thread:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+        for closeable in (self._selector, self._wake_recv, self._wake_send):
+            try:
+                closeable.close()
+            except Exception:
+                pass
+
+    def _run(self) -> None:
+        while self.is_running:
+            try:
+                events = self._selector.select(timeout=self.select_timeout)
+            except (OSError, ValueError):
+                # A socket was closed under us (shutdown); back off briefly
+                time.sleep(0.05)
+                continue
+            for key, _mask in events:
+                try:
+                    key.data()
+                except Exception:
+                    pass  # One bad datagram must not stop the loop
+
+
 class SyncReceiver:
     """Handles time sync reception for collaborators"""
 
+    # Upper bound on datagrams read per wakeup (see _drain_to_newest)
+    MAX_DRAIN_BATCH = 64
+
     def __init__(self, sync_port: int = 5005, sync_callback: Optional[Callable] = None):
         self.sync_port = sync_port
         self.sync_callback = sync_callback
         self.is_running = False
         self.sync_sock = None
         self.last_sync_time = 0
+        self._event_loop: Optional[UdpListenerLoop] = None
+        self._has_recvmsg = hasattr(socket.socket, "recvmsg")
+        # Reused receive buffer: drained stale packets are read into it and
+        # overwritten without ever becoming bytes objects (see _recv_packet)
+        self._rx_buf = bytearray(1024)
+        self._rx_view = memoryview(self._rx_buf)
+        # recvmmsg slots (Linux): one syscall per wakeup drains the backlog
+        self._batch: Optional[RecvMmsgBatch] = None
 
     def setup_socket(self) -> None:
         """Initialize sync receive socket"""
@@ -236,24 +509,39 @@ class SyncReceiver:
                     except Exception:
                         pass
                     
+            # Set a high buffer size for the socket to avoid OS-level drops
+            try:
+                self.sync_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, SYNC_RCVBUF_BYTES)
+            except OSError:
+                pass
+
             self.sync_sock.bind(("", self.sync_port))
         except Exception as e:
             raise NetworkError(f"Failed to setup sync receive socket: {e}")
 
-    def start_listening(self) -> None:
-        """Start listening for time sync"""
+        if RECVMMSG_AVAILABLE:
+            try:
+                self._batch = RecvMmsgBatch(self.sync_sock, self.MAX_DRAIN_BATCH, len(self._rx_buf))
+            except OSError:
+                self._batch = None
+
+    def start_listening(self, event_loop: Optional[UdpListenerLoop] = None) -> None:
+        """Start listening for time sync.
+
+        With an event_loop the socket is served by that shared selector
+        thread; otherwise a dedicated listener thread is started.
+        """
         self.is_running = True
 
         if not self.sync_sock:
             self.setup_socket()
 
-        def listen_loop():
-            # Set a high buffer size for the socket to avoid OS-level drops
-            try:
-                self.sync_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 1024 * 128)
-            except Exception:
-                pass
+        if event_loop is not None:
+            self._event_loop = event_loop
+            event_loop.register(self.sync_sock, self._on_readable)
+            return
 
+        def listen_loop():
             # Use a shorter timeout for responsive shutdown
             self.sync_sock.settimeout(0.5)
             
@@ -261,12 +549,7 @@ class SyncReceiver:
                 try:
                     # 1. Block on the first packet (lowest CPU)
                     try:
-                        if hasattr(self.sync_sock, "recvmsg"):
-                            data, ancdata, flags, addr = self.sync_sock.recvmsg(1024, 128)
-                            received_at = _extract_kernel_timestamp(ancdata) or time.time()
-                        else:
-                            data, addr = self.sync_sock.recvfrom(1024)
-                            received_at = time.time()
+                        packet = self._recv_packet()
                     except socket.timeout:
                         continue
                     except (socket.error, OSError):
@@ -274,23 +557,22 @@ class SyncReceiver:
                             break
                         continue
                     
-                    # 2. Aggressively drain the buffer to find the NEWEST packet
-                    # This eliminates 'buffer bloat' latency.
-                    self.sync_sock.setblocking(False)
-                    packets_drained = 0
-                    while self.is_running:
-                        try:
-                            if hasattr(self.sync_sock, "recvmsg"):
-                                new_data, new_ancdata, new_flags, new_addr = self.sync_sock.recvmsg(1024, 128)
-                                data, addr = new_data, new_addr
-                                received_at = _extract_kernel_timestamp(new_ancdata) or time.time()
-                            else:
-                                new_data, new_addr = self.sync_sock.recvfrom(1024)
-                                data, addr = new_data, new_addr
-                                received_at = time.time()
-                            packets_drained += 1
-                        except (socket.error, BlockingIOError):
+                    # 2. Aggressively drain the buffer to find the NEWEST packet.
+                    # recvmmsg passes MSG_DONTWAIT itself, so the socket's
+                    # timeout mode is never toggled.
+                    if self._batch is not None:
+                        newest = self._recv_batch_newest()
+                        if not self.is_running:
                             break
+                        if newest is None:
+                            self._dispatch_packet(*self._resolve_packet(packet))
+                        else:
+                            data, addr, received_at, count = newest
+                            self._dispatch_packet(data, addr, received_at, count)
+                        continue
+
+                    self.sync_sock.setblocking(False)
+                    packet, packets_drained = self._drain_to_newest(packet)
                     
                     if not self.is_running:
                         break
@@ -299,39 +581,8 @@ class SyncReceiver:
                     self.sync_sock.setblocking(True)
                     self.sync_sock.settimeout(0.5)
 
-                    msg = json.loads(data.decode())
-
-                    if msg.get("type") == "sync":
-                        self.last_sync_time = received_at
-                        leader_time = msg.get("time", 0)
-                        leader_id = msg.get("leader_id", "unknown")
-                        sent_at = msg.get("sent_at")
-                        position_read_time = msg.get("position_read_time", sent_at)
+                    self._dispatch_packet(*self._resolve_packet(packet), packets_drained)
 
-                        if self.sync_callback:
-                            try:
-                                # Execute callback with high precision timestamp and leader IP
-                                source = msg.get("source", "wall")
-                                leader_ip = addr[0] if addr else None
-                                try:
-                                    self.sync_callback(leader_time, received_at, leader_id, sent_at, source, position_read_time, leader_ip)
-                                except TypeError:
-                                    try:
-                                        self.sync_callback(leader_time, received_at, leader_id, sent_at, source, position_read_time)
-                                    except TypeError:
-                                        self.sync_callback(leader_time, received_at, leader_id)
-                                        
-                                if packets_drained > 5:
-                                    log_info(
-                                        f"Sync: Drained {packets_drained} stale packets (Critical latency recovered)",
-                                        component="sync",
-                                    )
-
-                            except Exception:
-                                pass # Avoid stopping loop on user callback error
-
-                except json.JSONDecodeError:
-                    continue
                 except Exception:
                     if self.is_running:
                         pass
@@ -340,9 +591,132 @@ class SyncReceiver:
         thread.start()
         # print("Started listening for time sync")
 
+    def _recv_packet(self) -> tuple:
+        """Read one datagram into _rx_buf as (nbytes, addr, ancdata, fallback_time).
+
+        Payload bytes and the kernel timestamp are materialised later by
+        _resolve_packet, and only for the datagram that is actually used -
+        drained stale packets cost neither an allocation nor cmsg parsing.
+        The buffer is only valid until the next read.
+        """
+        if self._has_recvmsg:
+            nbytes, ancdata, _flags, addr = self.sync_sock.recvmsg_into([self._rx_view], 128)
+            return nbytes, addr, ancdata, time.time()
+        nbytes, addr = self.sync_sock.recvfrom_into(self._rx_view)
+        return nbytes, addr, None, time.time()
+
+    def _resolve_packet(self, packet: tuple) -> tuple:
+        nbytes, addr, ancdata, fallback_time = packet
+        received_at = (_extract_kernel_timestamp(ancdata) if ancdata else None) or fallback_time
+        return bytes(self._rx_view[:nbytes]), addr, received_at
+
+    def _drain_to_newest(self, packet: tuple) -> tuple:
+        """Read queued datagrams (socket must be non-blocking) and keep only
+        the newest. This eliminates 'buffer bloat' latency.
+
+        Where recvmmsg(2) isn't available (see _on_readable_batched) this is
+        the batched equivalent: one wakeup drains up to MAX_DRAIN_BATCH
+        datagrams back-to-back. The bound keeps a flood from starving the
+        command socket on a shared UdpListenerLoop; anything left over
+        re-arms the selector.
+        """
+        packets_drained = 0
+        while self.is_running and packets_drained < self.MAX_DRAIN_BATCH:
+            try:
+                packet = self._recv_packet()
+                packets_drained += 1
+            except (socket.error, BlockingIOError):
+                break
+        return packet, packets_drained
+
+    def _on_readable(self) -> None:
+        """Selector callback: the socket is non-blocking here."""
+        if self._batch is not None:
+            self._on_readable_batched()
+            return
+        try:
+            packet = self._recv_packet()
+        except (socket.error, BlockingIOError):
+            return
+        packet, packets_drained = self._drain_to_newest(packet)
+        if self.is_running:
+            self._dispatch_packet(*self._resolve_packet(packet), packets_drained)
+
+    def _recv_batch_newest(self) -> Optional[tuple]:
+        """Read the queued backlog with one recvmmsg call.
+
+        Returns (data, addr, received_at, count) for the newest datagram, or
+        None when nothing was queued. Only that slot's payload and kernel
+        timestamp are materialised.
+        """
+        try:
+            count = self._batch.recv()
+        except OSError:  # incl. BlockingIOError: nothing queued
+            return None
+        if count == 0:
+            return None
+        newest = count - 1
+        ancdata = self._batch.ancdata(newest)
+        received_at = (_extract_kernel_timestamp(ancdata) if ancdata else None) or time.time()
+        return self._batch.payload(newest), self._batch.address(newest), received_at, count
+
+    def _on_readable_batched(self) -> None:
+        """_on_readable via recvmmsg: the read and the drain are one syscall
+        (the per-datagram path needs one per packet plus one for EAGAIN)."""
+        newest = self._recv_batch_newest()
+        if newest is None or not self.is_running:
+            return
+        data, addr, received_at, count = newest
+        self._dispatch_packet(data, addr, received_at, count - 1)
+
+    def _dispatch_packet(self, data: bytes, addr, received_at: float, packets_drained: int = 0) -> None:
+        frame = unpack_sync_frame(data)
+        if frame is not None:
+            leader_time, leader_id, source, _duration, sent_at, position_read_time = frame
+        else:
+            if not data.startswith(_JSON_SYNC_PREFIXES):
+                return
+            try:
+                msg = decode_json(data)
+            except (json.JSONDecodeError, UnicodeDecodeError):
+                return
+            if msg.get("type") != "sync":
+                return
+            leader_time = msg.get("time", 0)
+            leader_id = msg.get("leader_id", "unknown")
+            sent_at = msg.get("sent_at")
+            position_read_time = msg.get("position_read_time", sent_at)
+            source = msg.get("source", "wall")
+
+        self.last_sync_time = received_at
+
+        if self.sync_callback:
+            try:
+                # Execute callback with high precision timestamp and leader IP
+                leader_ip = addr[0] if addr else None
+                try:
+                    self.sync_callback(leader_time, received_at, leader_id, sent_at, source, position_read_time, leader_ip)
+                except TypeError:
+                    try:
+                        self.sync_callback(leader_time, received_at, leader_id, sent_at, source, position_read_time)
+                    except TypeError:
+                        self.sync_callback(leader_time, received_at, leader_id)
+                        
+                if packets_drained > 5:
+                    log_info(
+                        f"Sync: Drained {packets_drained} stale packets (Critical latency recovered)",
+                        component="sync",
+                    )
+
+            except Exception:
+                pass # Avoid stopping loop on user callback error
+
     def stop_listening(self) -> None:
         """Stop listening for time sync"""
         self.is_running = False
+        if self._event_loop is not None and self.sync_sock:
+            self._event_loop.unregister(self.sync_sock)
+            self._event_loop = None
         if self.sync_sock:
             try:
                 self.sync_sock.close()
@@ -411,6 +785,10 @@ class CommandManager:
             self.control_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.control_sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
             self.control_sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            # Heartbeats from every collaborator plus log/file-list replies
+            # (up to ~30KB each) can land together
+            self.control_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, CONTROL_RCVBUF_BYTES)
+            _mark_low_delay(self.control_sock)
             
             # Use SO_REUSEPORT if available (Linux/macOS) to allow multiple 
             # listeners on the same machine to share the port.
@@ -436,11 +814,14 @@ class CommandManager:
             while self.is_running:
                 try:
                     data, addr = self.control_sock.recvfrom(UDP_MAX_DATAGRAM_SIZE)
-                    msg_text = data.decode()
+                    if data[:1] != _JSON_OBJECT_START:
+                        continue
                     # Per-datagram at INFO: silent unless enable_system_logging
-                    # (was a print() — journal noise scaling with node count)
-                    log_info(f"Net: received from {addr}: {msg_text[:300]}", component="network")
-                    msg = json.loads(msg_text)
+                    # (was a print() — journal noise scaling with node count).
+                    # Checked first so the decode + format is skipped when off.
+                    if info_logging_enabled():
+                        log_info(f"Net: received from {addr}: {data[:300].decode(errors='replace')}", component="network")
+                    msg = decode_json(data)
                     
                     msg_type = msg.get("type")
                     if msg_type in self.message_handlers:
@@ -496,21 +877,25 @@ class CommandManager:
         if self.control_sock is None:
             self.control_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
             self.control_sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+            _mark_low_delay(self.control_sock)
 
     def send_command(
         self, command: Dict[str, Any], target_pi: Optional[str] = None
     ) -> None:
-        """Send command to collaborator Pi(s)"""
+        """Send command to collaborator Pi(s).
+
+        All sends go out on the one cached control socket, and the payload is
+        encoded once for the direct sends plus the broadcast.
+        """
         self._ensure_send_socket()
-        payload = json.dumps(command)
+        payload = encode_json(command)
 
         # 1. Direct Send (to specific target or ALL registered collaborators)
         if target_pi:
             if target_pi in self.collaborators:
                 ip = self.collaborators[target_pi]["ip"]
                 try:
-                    self._ping_sent_at[target_pi] = time.time()
-                    self.control_sock.sendto(payload.encode(), (ip, self.control_port))
+                    self.control_sock.sendto(payload, (ip, self.control_port))
                     log_info(f"Net: sent {command['type']} directly to {target_pi} ({ip})", component="network")
                 except Exception:
                     pass
@@ -518,8 +903,7 @@ class CommandManager:
             # Send to every registered IP directly for maximum reliability
             for device_id, info in self.collaborators.items():
                 try:
-                    self._ping_sent_at[device_id] = time.time()
-                    self.control_sock.sendto(payload.encode(), (info["ip"], self.control_port))
+                    self.control_sock.sendto(payload, (info["ip"], self.control_port))
                     log_info(f"Net: sent {command['type']} directly to {device_id} ({info['ip']})", component="network")
                 except Exception:
                     pass
@@ -527,7 +911,7 @@ class CommandManager:
         # 2. Broadcast (as fallback and for unregistered nodes)
         try:
             self.control_sock.sendto(
-                payload.encode(), (self.broadcast_ip, self.control_port)
+                payload, (self.broadcast_ip, self.control_port)
             )
             log_info(f"Net: broadcast {command['type']} to {self.broadcast_ip}", component="network")
         except Exception as e:
@@ -536,7 +920,7 @@ class CommandManager:
     def send_ping(self, target_pi: Optional[str] = None) -> None:
         """Send an explicit latency probe to one or all registered collaborators."""
         self._ensure_send_socket()
-        ping = {"type": "ping", "sent_at": time.time()}
+        payload = encode_json({"type": "ping", "sent_at": time.time()})
         targets = []
 
         if target_pi:
@@ -550,10 +934,12 @@ class CommandManager:
                 if info.get("online", True)
             ]
 
+        # Only pings are stamped (pongs answer nothing else), on the
+        # monotonic clock so an NTP step mid-probe can't skew the RTT
         for device_id, ip in targets:
             try:
                 self._ping_sent_at[device_id] = time.monotonic()
-                self.control_sock.sendto(json.dumps(ping).encode(), (ip, self.control_port))
+                self.control_sock.sendto(payload, (ip, self.control_port))
             except Exception:
                 self._ping_sent_at.pop(device_id, None)
 
@@ -569,10 +955,16 @@ class CommandManager:
             if sent_at is not None:
                 rtt = time.monotonic() - sent_at
                 self._record_rtt_sample(device_id, rtt)
-                # Send the RTT / 2 back to the collaborator so they know their transport latency!
+                samples = self._rtt_samples.get(device_id)
+                if not samples:
+                    return
+                # Queuing (WiFi retries, airtime contention) and the
+                # collaborator's reply delay only ever ADD to an RTT, so the
+                # fastest recent probe is the best estimate of the path
+                # itself; half of it is the one-way transport latency.
                 latency_msg = {
                     "type": "latency_update",
-                    "latency": rtt / 2.0
+                    "latency": min(samples) / 2.0
                 }
                 self.send_command(latency_msg, target_pi=device_id)
             return
@@ -634,44 +1026,62 @@ class CommandManager:
 class CommandListener:
     """Handles command listening for collaborators"""
 
+    # Upper bound on datagrams handled per selector wakeup (see _on_readable)
+    MAX_DRAIN_BATCH = 32
+
     def __init__(self, control_port: int = 5006):
         self.control_port = control_port
         self.control_sock = None
         self.is_running = False
         self.message_handlers = {}
+        self._event_loop: Optional[UdpListenerLoop] = None
         # Cached send socket + broadcast address (see send_message)
         self._send_sock = None
         self._broadcast_ip = None
+        # Pre-encoded heartbeat head for the fields that rarely change
+        # (see send_heartbeat)
+        self._hb_static_key: Optional[tuple] = None
+        self._hb_prefix = b""
+        self._hb_live_key: Optional[tuple] = None
+        self._hb_payload = b""
+        # Reused receive buffer: recvfrom(65535) allocated (and then shrank)
+        # a fresh 64 KiB bytes object for every command datagram
+        self._rx_buf = bytearray(UDP_MAX_DATAGRAM_SIZE)
+        self._rx_view = memoryview(self._rx_buf)
 
     def setup_socket(self) -> None:
         """Initialize command socket"""
         try:
             self.control_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+            try:
+                self.control_sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, CONTROL_RCVBUF_BYTES)
+            except OSError:
+                pass
             self.control_sock.bind(("", self.control_port))
         except Exception as e:
             raise NetworkError(f"Failed to setup command socket: {e}")
 
-    def start_listening(self) -> None:
-        """Start listening for commands"""
+    def start_listening(self, event_loop: Optional[UdpListenerLoop] = None) -> None:
+        """Start listening for commands.
+
+        With an event_loop the socket is served by that shared selector
+        thread; otherwise a dedicated listener thread is started.
+        """
         self.is_running = True
 
         if not self.control_sock:
             self.setup_socket()
 
+        if event_loop is not None:
+            self._event_loop = event_loop
+            event_loop.register(self.control_sock, self._on_readable)
+            return
+
         def listen_loop():
             while self.is_running:
                 try:
-                    data, addr = self.control_sock.recvfrom(UDP_MAX_DATAGRAM_SIZE)
-                    msg = json.loads(data.decode())
-                    
-                    msg_type = msg.get("type")
-                    if msg_type in self.message_handlers:
-                        self.message_handlers[msg_type](msg, addr)
-                    elif "__all__" in self.message_handlers:
-                        self.message_handlers["__all__"](msg, addr)
-
-                except json.JSONDecodeError:
-                    continue
+                    nbytes, addr = self.control_sock.recvfrom_into(self._rx_view)
+                    self._dispatch_datagram(self._rx_view[:nbytes], addr)
                 except Exception as e:
                     if self.is_running:
                         pass  # Ignore command listener errors
@@ -680,9 +1090,45 @@ class CommandListener:
         thread.start()
         # print("Started listening for leader commands")
 
+    def _on_readable(self) -> None:
+        """Selector callback: the socket is non-blocking here.
+
+        Drains queued commands until EAGAIN (bounded by MAX_DRAIN_BATCH) so
+        a burst - e.g. the leader's direct sends plus its broadcast copy -
+        costs one selector wakeup instead of one per datagram. Every command
+        is dispatched; unlike sync ticks none can be skipped.
+        """
+        for _ in range(self.MAX_DRAIN_BATCH):
+            if not self.is_running:
+                return
+            try:
+                nbytes, addr = self.control_sock.recvfrom_into(self._rx_view)
+            except (socket.error, BlockingIOError):
+                return
+            self._dispatch_datagram(self._rx_view[:nbytes], addr)
+
+    def _dispatch_datagram(self, data, addr) -> None:
+        """Decode and route one command. data may be a view of _rx_buf; it
+        is only valid during this call, so handlers get the decoded dict."""
+        if data[:1] != _JSON_OBJECT_START:
+            return
+        try:
+            msg = decode_json(data)
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return
+
+        msg_type = msg.get("type")
+        if msg_type in self.message_handlers:
+            self.message_handlers[msg_type](msg, addr)
+        elif "__all__" in self.message_handlers:
+            self.message_handlers["__all__"](msg, addr)
+
     def stop_listening(self) -> None:
         """Stop listening for commands"""
         self.is_running = False
+        if self._event_loop is not None and self.control_sock:
+            self._event_loop.unregister(self.control_sock)
+            self._event_loop = None
         if self.control_sock:
             try:
                 self.control_sock.close()
@@ -711,7 +1157,11 @@ class CommandListener:
         self.send_message(registration)
 
     def send_message(self, message: Dict[str, Any], host: Optional[str] = None) -> None:
-        """Send a control message directly or via broadcast.
+        """Send a control message directly or via broadcast."""
+        self._send_payload(encode_json(message), host)
+
+    def _send_payload(self, payload: bytes, host: Optional[str] = None) -> None:
+        """Send already-encoded bytes to host, or broadcast if host is None.
 
         Socket and broadcast address are cached: this runs for every 2s
         heartbeat, and the old per-call socket + 8.8.8.8-probe pattern
@@ -723,16 +1173,14 @@ class CommandListener:
             if self._send_sock is None:
                 self._send_sock = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
                 self._send_sock.setsockopt(socket.SOL_SOCKET, socket.SO_BROADCAST, 1)
+                _mark_low_delay(self._send_sock)
             if host is None:
                 if self._broadcast_ip is None:
                     self._broadcast_ip = _get_broadcast_address()
                 destination_host = self._broadcast_ip
             else:
                 destination_host = host
-            self._send_sock.sendto(
-                json.dumps(message).encode(),
-                (destination_host, self.control_port),
-            )
+            self._send_sock.sendto(payload, (destination_host, self.control_port))
         except Exception:
             try:
                 if self._send_sock:
@@ -743,17 +1191,36 @@ class CommandListener:
             self._broadcast_ip = None
 
     def send_heartbeat(self, device_id: str, status: str = "ready", hard_seeks: int = 0, video_file: str = "", is_optimized: bool = False, video_driver: str = "", sync_deviation: float = 0.0, playback_rate: float = 1.0, pi_model: str = "") -> None:
-        """Send heartbeat to leader"""
-        heartbeat = {
-            "type": "heartbeat",
-            "device_id": device_id,
-            "status": status,
-            "hard_seeks": hard_seeks,
-            "video_file": video_file,
-            "is_optimized": is_optimized,
-            "video_driver": video_driver,
-            "sync_deviation": sync_deviation,
-            "playback_rate": playback_rate,
-            "pi_model": pi_model,
-        }
-        self.send_message(heartbeat)
+        """Send heartbeat to leader.
+
+        Identity fields only change on a video switch, so their JSON is
+        encoded once and reused. Each beat encodes just the live fields
+        and appends them - unless they match the previous beat (an idle or
+        bystander node), in which case the last payload is resent as is.
+        Both parts go through encode_json, so with orjson there is no str
+        step at all; the splice only relies on each part being one object.
+        """
+        static_key = (device_id, video_file, is_optimized, video_driver, pi_model)
+        if static_key != self._hb_static_key:
+            head = encode_json({
+                "type": "heartbeat",
+                "device_id": device_id,
+                "video_file": video_file,
+                "is_optimized": is_optimized,
+                "video_driver": video_driver,
+                "pi_model": pi_model,
+            })
+            self._hb_prefix = head[:-1] + b","
+            self._hb_static_key = static_key
+            self._hb_live_key = None
+        live_key = (status, hard_seeks, sync_deviation, playback_rate)
+        if live_key != self._hb_live_key:
+            live = encode_json({
+                "status": status,
+                "hard_seeks": hard_seeks,
+                "sync_deviation": sync_deviation,
+                "playback_rate": playback_rate,
+            })
+            self._hb_payload = self._hb_prefix + live[1:]
+            self._hb_live_key = live_key
+        self._send_payload(self._hb_payload)
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Batched UDP receive via Linux recvmmsg(2)
+
+Python's socket module has recvmsg() but no recvmmsg(), so draining a
+socket costs one syscall per datagram plus a final one that hits EAGAIN.
+RecvMmsgBatch wraps libc's recvmmsg with ctypes: every buffer, address and
+ancillary-data slot is allocated once, and one non-blocking call returns
+everything queued (up to the batch size).
+
+Linux + glibc only (msghdr layout). RECVMMSG_AVAILABLE is False elsewhere
+and callers keep their per-datagram path.
+"""
+
+import ctypes
+import ctypes.util
+import errno
+import os
+import socket
+import struct
+import sys
+from typing import List, Optional, Tuple
+
+_libc = None
+if sys.platform.startswith("linux"):
+    try:
+        _libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        _libc.recvmmsg  # attribute lookup raises if the symbol is missing
+    except (OSError, AttributeError):
+        _libc = None
+
+RECVMMSG_AVAILABLE = _libc is not None
+
+_MSG_DONTWAIT = 0x40
+_SOCKADDR_SIZE = 128  # sizeof(struct sockaddr_storage)
+_SIZE_T = ctypes.sizeof(ctypes.c_size_t)
+# struct cmsghdr { size_t cmsg_len; int cmsg_level; int cmsg_type; }
+_CMSG_HEADER = struct.Struct("@Nii")
+
+
+def _cmsg_align(length: int) -> int:
+    return (length + _SIZE_T - 1) & ~(_SIZE_T - 1)
+
+
+_CMSG_DATA_OFFSET = _cmsg_align(_CMSG_HEADER.size)
+
+
+class _IOVec(ctypes.Structure):
+    _fields_ = [("iov_base", ctypes.c_void_p), ("iov_len", ctypes.c_size_t)]
+
+
+class _MsgHdr(ctypes.Structure):
+    _fields_ = [
+        ("msg_name", ctypes.c_void_p),
+        ("msg_namelen", ctypes.c_uint32),
+        ("msg_iov", ctypes.POINTER(_IOVec)),
+        ("msg_iovlen", ctypes.c_size_t),
+        ("msg_control", ctypes.c_void_p),
+        ("msg_controllen", ctypes.c_size_t),
+        ("msg_flags", ctypes.c_int),
+    ]
+
+
+class _MMsgHdr(ctypes.Structure):
+    _fields_ = [("msg_hdr", _MsgHdr), ("msg_len", ctypes.c_uint)]
+
+
+if RECVMMSG_AVAILABLE:
+    _libc.recvmmsg.argtypes = [
+        ctypes.c_int, ctypes.POINTER(_MMsgHdr), ctypes.c_uint, ctypes.c_int, ctypes.c_void_p,
+    ]
+    _libc.recvmmsg.restype = ctypes.c_int
+
+
+class RecvMmsgBatch:
+    """Preallocated recvmmsg(2) slots for one IPv4 UDP socket.
+
+    recv() fills up to `count` slots without blocking and returns how many
+    arrived; payload()/address()/ancdata() then read slot i. Slot contents
+    are only valid until the next recv().
+    """
+
+    def __init__(self, sock: socket.socket, count: int = 64, bufsize: int = 1024, controllen: int = 128):
+        if not RECVMMSG_AVAILABLE:
+            raise OSError(errno.ENOSYS, "recvmmsg is not available on this platform")
+        self.sock = sock
+        self.count = count
+        self.bufsize = bufsize
+        self.controllen = controllen
+        self._payloads = ctypes.create_string_buffer(count * bufsize)
+        self._names = ctypes.create_string_buffer(count * _SOCKADDR_SIZE)
+        self._controls = ctypes.create_string_buffer(count * controllen)
+        self._iovecs = (_IOVec * count)()
+        self._msgs = (_MMsgHdr * count)()
+
+        payload_base = ctypes.addressof(self._payloads)
+        name_base = ctypes.addressof(self._names)
+        control_base = ctypes.addressof(self._controls)
+        for i in range(count):
+            self._iovecs[i].iov_base = payload_base + i * bufsize
+            self._iovecs[i].iov_len = bufsize
+            hdr = self._msgs[i].msg_hdr
+            hdr.msg_name = name_base + i * _SOCKADDR_SIZE
+            hdr.msg_namelen = _SOCKADDR_SIZE
+            hdr.msg_iov = ctypes.pointer(self._iovecs[i])
+            hdr.msg_iovlen = 1
+            hdr.msg_control = control_base + i * controllen
+            hdr.msg_controllen = controllen
+        self._filled = 0
+
+    def recv(self) -> int:
+        """Read every queued datagram (up to count) in one syscall.
+
+        Raises BlockingIOError when nothing is queued, OSError on failure.
+        """
+        # The kernel shrinks namelen/controllen to what it wrote; only the
+        # slots used by the previous call need restoring.
+        for i in range(self._filled):
+            hdr = self._msgs[i].msg_hdr
+            hdr.msg_namelen = _SOCKADDR_SIZE
+            hdr.msg_controllen = self.controllen
+        self._filled = 0
+        received = _libc.recvmmsg(self.sock.fileno(), self._msgs, self.count, _MSG_DONTWAIT, None)
+        if received < 0:
+            err = ctypes.get_errno()
+            raise OSError(err, os.strerror(err))
+        self._filled = received
+        return received
+
+    def payload(self, i: int) -> bytes:
+        length = min(self._msgs[i].msg_len, self.bufsize)
+        return ctypes.string_at(ctypes.addressof(self._payloads) + i * self.bufsize, length)
+
+    def address(self, i: int) -> Optional[Tuple[str, int]]:
+        # Just this slot's family/port/addr; .raw would copy every slot
+        raw = ctypes.string_at(ctypes.addressof(self._names) + i * _SOCKADDR_SIZE, 8)
+        family = struct.unpack_from("@H", raw)[0]
+        if family != socket.AF_INET:
+            return None
+        return socket.inet_ntoa(raw[4:8]), struct.unpack_from("!H", raw, 2)[0]
+
+    def ancdata(self, i: int) -> List[Tuple[int, int, bytes]]:
+        """Control messages for slot i, in socket.recvmsg()'s ancdata format."""
+        used = self._msgs[i].msg_hdr.msg_controllen
+        start = i * self.controllen
+        control = ctypes.string_at(ctypes.addressof(self._controls) + start, min(used, self.controllen))
+        items = []
+        offset = 0
+        while offset + _CMSG_HEADER.size <= len(control):
+            cmsg_len, level, cmsg_type = _CMSG_HEADER.unpack_from(control, offset)
+            if cmsg_len < _CMSG_DATA_OFFSET or offset + cmsg_len > len(control):
+                break
+            items.append((level, cmsg_type, control[offset + _CMSG_DATA_OFFSET:offset + cmsg_len]))
+            offset += _cmsg_align(cmsg_len)
+        return items
@@ -8,8 +8,12 @@ Handles MIDI output and scheduling
 import time
 import glob
 import bisect
-from typing import List, Dict, Any, Set, Optional
-from core.logger import log_info
+import queue
+import threading
+from array import array
+from typing import Callable, List, Dict, Any, Optional
+from core.logger import info_logging_enabled, log_info
+from core.node_common import MIDI_CPU_SLOT, elevate_thread_priority, pin_thread_to_cpu
 
 
 # Try to import rtmidi
@@ -45,7 +49,10 @@ class MockMidiOut:
         print(f"MIDI: Opened mock port {port}")
 
     def send_message(self, message: List[int]) -> None:
-        print(f"MIDI: {message}")
+        # Called per cue in simulation mode: a print here flushed stdout
+        # (the journal) on the MIDI writer thread for every event
+        if info_logging_enabled():
+            log_info(f"MIDI (mock): {list(message)}", component="midi")
 
     def close_port(self) -> None:
         print("MIDI: Closed mock port")
@@ -87,12 +94,26 @@ class SerialMidiOut:
             return
         try:
             self.ser = serial.Serial(self.port, self.baud, timeout=self.timeout)
+            self._enable_low_latency()
             time.sleep(2)  # Wait for Arduino to reset
             print(f" Serial MIDI output initialized on {self.port} @ {self.baud}")
         except Exception as e:
             print(f" Serial MIDI setup failed: {e}")
             self.ser = None
 
+    def _enable_low_latency(self):
+        """Ask the tty driver to push each write out immediately.
+
+        USB-serial adapters (FTDI, CH340 on /dev/ttyUSB*) otherwise hold
+        outgoing bytes for their latency timer, typically 16ms, which
+        lands every cue late by a variable amount. CDC-ACM boards and
+        non-Linux hosts don't support the flag; that's fine.
+        """
+        try:
+            self.ser.set_low_latency_mode(True)
+        except (AttributeError, OSError, ValueError) as e:
+            print(f" Serial MIDI: low-latency mode unavailable ({e})")
+
     def send_message(self, message: List[int]):
         # Not used for serial, but kept for compatibility
         pass
@@ -109,6 +130,14 @@ class SerialMidiOut:
         # Not implemented for Arduino serial version
         pass
 
+    def write_raw(self, data: bytes):
+        """Write pre-encoded command lines (see MidiManager.compile_cue)."""
+        if self.ser:
+            try:
+                self.ser.write(data)
+            except Exception:
+                pass
+
     def close_port(self):
         if self.ser:
             self.ser.close()
@@ -152,6 +181,13 @@ class SerialMidiOut:
             pass
 
 
+# Stop-path "panic" output, built once. MIDI ports get All Sound Off (CC 120)
+# and All Notes Off (CC 123) on every channel; the Arduino bridge gets every
+# relay output (notes 60-71) driven to 0 in a single write.
+_PANIC_MESSAGES = tuple(bytes((0xB0 | ch, cc, 0)) for ch in range(16) for cc in (123, 120))
+_SERIAL_ALL_OFF = b"".join(f"{note} 0\n".encode() for note in range(60, 72))
+
+
 class MidiError(Exception):
     """Raised when MIDI operations fail"""
 
@@ -175,7 +211,55 @@ class MidiManager:
         self.serial_port = serial_port
         self.serial_baud = serial_baud
         self.midi_out = None
+        # Set by start_writer(); until then (or after cleanup) sends are synchronous
+        self._out_queue: Optional[queue.SimpleQueue] = None
+        self._writer_thread: Optional[threading.Thread] = None
         self._setup_midi()
+        self.start_writer()
+
+    def start_writer(self) -> None:
+        """Move port writes for cues and panics onto a dedicated thread.
+
+        The scheduler hands pre-encoded output to a SimpleQueue (C-level,
+        no Python lock) and returns. A USB-serial bridge that stops
+        draining blocks pyserial's write with no timeout; inline, that
+        stalled the collaborator's sync thread and its video correction,
+        and every cue behind it. Queue order is send order.
+        """
+        if self._writer_thread is not None:
+            return
+        self._out_queue = queue.SimpleQueue()
+        self._writer_thread = threading.Thread(
+            target=self._writer_loop, args=(self._out_queue,), daemon=True
+        )
+        self._writer_thread.start()
+
+    def _writer_loop(self, out_queue: queue.SimpleQueue) -> None:
+        # Asleep in get() between cues, so safe to run SCHED_FIFO
+        elevate_thread_priority(component="midi")
+        pin_thread_to_cpu("midi", MIDI_CPU_SLOT)
+        while True:
+            item = out_queue.get()
+            if item is None:
+                return
+            write, args = item
+            write(*args)  # each _write_* handles its own errors
+
+    def _stop_writer(self) -> None:
+        out_queue, thread = self._out_queue, self._writer_thread
+        if thread is None:
+            return
+        self._out_queue = None
+        self._writer_thread = None
+        out_queue.put(None)  # after anything already queued
+        thread.join(timeout=1.0)
+
+    def _dispatch(self, write: Callable[..., None], *args: Any) -> None:
+        out_queue = self._out_queue
+        if out_queue is not None:
+            out_queue.put((write, args))
+        else:
+            write(*args)
 
     def _setup_midi(self) -> None:
         """Initialize MIDI or Serial output"""
@@ -241,17 +325,17 @@ class MidiManager:
         except Exception as e:
             print(f"Error sending control change: {e}")
 
-    def send_cue_message(self, cue: Dict[str, Any]) -> None:
-        """Send MIDI message based on cue data"""
+    @staticmethod
+    def _cue_type(cue: Dict[str, Any]) -> str:
         cue_type = cue.get("type")
-
         # If no type specified, auto-detect from velocity
         if not cue_type:
-            velocity = cue.get("velocity", 0)
-            if velocity > 0:
-                cue_type = "note_on"
-            else:
-                cue_type = "note_off"
+            cue_type = "note_on" if cue.get("velocity", 0) > 0 else "note_off"
+        return cue_type
+
+    def send_cue_message(self, cue: Dict[str, Any]) -> None:
+        """Send MIDI message based on cue data"""
+        cue_type = self._cue_type(cue)
 
         if cue_type == "note_on":
             self.send_note_on(
@@ -266,8 +350,107 @@ class MidiManager:
         else:
             print(f" Unknown MIDI cue type: {cue_type}")
 
+    @property
+    def _serial_output(self) -> bool:
+        return self.use_serial and hasattr(self.midi_out, "write_raw")
+
+    def compile_cue(self, cue: Dict[str, Any]) -> Optional[Any]:
+        """Pre-encode a schedule cue once, at schedule load.
+
+        Returns what the scheduler later hands to send_compiled(): a
+        (note, command line) pair for the Arduino serial bridge, or the raw
+        3-byte message for a MIDI port. None means the cue produces no
+        output on this device (unknown type, CC on the serial bridge).
+        """
+        cue_type = self._cue_type(cue)
+        note = cue.get("note", 60)
+        if self._serial_output:
+            if cue_type == "note_on":
+                return note, f"{note} {cue.get('velocity', 64)}\n".encode()
+            if cue_type == "note_off":
+                return note, f"{note} 0\n".encode()
+            return None
+
+        channel = max(0, min(15, cue.get("channel", 1) - 1))
+        if cue_type == "note_on":
+            status, data1, data2 = 0x90 | channel, note, cue.get("velocity", 64)
+        elif cue_type == "note_off":
+            status, data1, data2 = 0x80 | channel, note, 0
+        elif cue_type == "control_change":
+            status, data1, data2 = 0xB0 | channel, cue.get("control", 0), cue.get("value", 0)
+        else:
+            print(f" Unknown MIDI cue type: {cue_type}")
+            return None
+        return bytes((status, max(0, min(127, data1)), max(0, min(127, data2))))
+
+    def send_compiled(self, message: Any) -> None:
+        """Send one cue pre-encoded by compile_cue()."""
+        if message is not None:
+            self._dispatch(self._write_compiled, message)
+
+    def _write_compiled(self, message: Any) -> None:
+        try:
+            if self._serial_output:
+                self.midi_out.write_raw(message[1])
+            else:
+                self.midi_out.send_message(message)
+        except Exception as e:
+            print(f"Error sending cue: {e}")
+
+    def send_compiled_batch(self, messages: List[Any]) -> None:
+        """Send several pre-encoded cues that fell due in the same tick.
+
+        The Arduino bridge treats each note as an output level, so within
+        one tick only the last value per note is observable: intermediate
+        values are dropped (no sub-tick pulses) and the rest go out in one
+        serial write. Real MIDI ports receive every event, in order.
+        """
+        self._dispatch(self._write_compiled_batch, messages)
+
+    def _write_compiled_batch(self, messages: List[Any]) -> None:
+        if not self._serial_output:
+            # Bound once for the burst: no per-event _write_compiled frame
+            # or output-type check. One bad event doesn't drop the rest.
+            send = self.midi_out.send_message
+            for message in messages:
+                if message is None:
+                    continue
+                try:
+                    send(message)
+                except Exception as e:
+                    print(f"Error sending cue: {e}")
+            return
+
+        lines: Dict[int, bytes] = {}
+        for message in messages:
+            if message is None:
+                continue
+            note, line = message
+            lines.pop(note, None)  # keep final-write order
+            lines[note] = line
+        if lines:
+            try:
+                self.midi_out.write_raw(b"".join(lines.values()))
+            except Exception as e:
+                print(f"Error sending cue batch: {e}")
+
+    def all_notes_off(self) -> None:
+        """Silence every channel/output using the precomputed panic messages."""
+        self._dispatch(self._write_all_notes_off)
+
+    def _write_all_notes_off(self) -> None:
+        try:
+            if self._serial_output:
+                self.midi_out.write_raw(_SERIAL_ALL_OFF)
+            else:
+                for message in _PANIC_MESSAGES:
+                    self.midi_out.send_message(message)
+        except Exception as e:
+            print(f"Error sending all notes off: {e}")
+
     def cleanup(self) -> None:
         """Clean up MIDI resources"""
+        self._stop_writer()  # drains queued output before the port closes
         try:
             if self.midi_out:
                 self.midi_out.close_port()
@@ -279,10 +462,20 @@ class MidiManager:
 class MidiScheduler:
     """Handles scheduled MIDI events"""
 
+    # Longest a driving loop should sleep between process_cues() calls when no
+    # cue is due, so seeks/stops are still noticed promptly.
+    MAX_IDLE_WAIT = 0.25
+    # A long sleep toward a cue stops this far short of it, so the final
+    # approach is timed from a fresh position read (see next_wait)
+    REANCHOR_MARGIN = 0.005
+    # Backward steps up to this size are clock jitter (a refitted timeline
+    # can dip a few ms, or up to TimelineFit's jump threshold on a reset),
+    # not a seek: the cursor holds until the clock catches up
+    SEEK_TOLERANCE = 0.25
+
     def __init__(self, midi_manager: MidiManager):
         self.midi_manager = midi_manager
         self.schedule: List[Dict[str, Any]] = []
-        self.triggered_cues: Set[str] = set()
         self.is_running = False
         self.start_time: Optional[float] = None
         self.video_duration: Optional[float] = None
@@ -292,17 +485,27 @@ class MidiScheduler:
         self.last_effective_time: Optional[float] = (
             None  # Fire cues only as time advances
         )
+        # The index cursor is the dedup: each schedule entry fires at most
+        # once per pass, and entries sharing a timestamp all fire.
         self._next_cue_index = 0
+        # Cue times as packed doubles, parallel to schedule: the hot loop
+        # bisects this instead of touching the per-cue dicts.
+        self._cue_times = array("d")
+        # Output messages pre-encoded at load time, parallel to schedule
+        self._cue_messages: List[Any] = []
+        self._triggered_count = 0  # cues fired since the last reset
+        # (snapshot of the schedule, output mode) the arrays above were built
+        # from; a tuple copy, so edits to the caller's list or cues still show
+        self._compiled_from: Optional[tuple] = None
 
     def reset(self, seek_time: Optional[float] = None):
         """Reset triggered cues for fresh playback or loop."""
-        self.triggered_cues.clear()
         self._next_cue_index = 0
+        self._triggered_count = 0
 
         # If resetting to a specific time, find the correct starting index
         if seek_time is not None and self.schedule:
-            times = [cue.get("time", 0) for cue in self.schedule]
-            self._next_cue_index = bisect.bisect_left(times, seek_time)
+            self._next_cue_index = bisect.bisect_left(self._cue_times, seek_time)
 
         # Clear Arduino state and serial buffers when looping
         if (
@@ -318,10 +521,23 @@ class MidiScheduler:
         self.last_effective_time = None
 
     def load_schedule(self, schedule: List[Dict[str, Any]]) -> None:
-        """Load MIDI schedule"""
-        self.schedule = sorted(schedule, key=lambda x: x.get("time", 0))
-        self.triggered_cues.clear()
+        """Load MIDI schedule.
+
+        Sorting and compiling happen here, once; every start command carries
+        the schedule, so an unchanged one (replay of the same show) keeps the
+        arrays already built instead of recompiling on the start path.
+        """
+        source = (
+            tuple(tuple(cue.items()) for cue in schedule),
+            self.midi_manager._serial_output,
+        )
+        if source != self._compiled_from:
+            self._compiled_from = source
+            self.schedule = sorted(schedule, key=lambda x: x.get("time", 0))
+            self._cue_times = array("d", (cue.get("time", 0) for cue in self.schedule))
+            self._cue_messages = [self.midi_manager.compile_cue(cue) for cue in self.schedule]
         self._next_cue_index = 0
+        self._triggered_count = 0
         log_info(f"Loaded MIDI schedule with {len(self.schedule)} cues", component="midi")
 
     def start_playback(
@@ -342,10 +558,15 @@ class MidiScheduler:
         self.is_running = False
         self.start_time = None
         self.previous_playback_time = None  # Reset to prevent comparison issues
+        self.midi_manager.all_notes_off()
         log_info("Stopped MIDI playback", component="midi")
 
     def process_cues(self, current_time: float) -> None:
-        """Process MIDI cues for current time with optimized pointer-based iteration"""
+        """Fire the cues that fell due since the last call.
+
+        O(log N + k): bisects the packed cue times from the cursor and sends
+        the k pre-encoded messages; the cue dicts are never walked here.
+        """
         if not self.is_running or self.start_time is None or not self.schedule:
             return
 
@@ -387,6 +608,9 @@ class MidiScheduler:
 
         # Handle backward jumps (seeks) without full loop
         if self.last_effective_time is not None and effective_time < self.last_effective_time:
+            if self.last_effective_time - effective_time <= self.SEEK_TOLERANCE:
+                # Jitter: rewinding the cursor would re-fire cues already sent
+                return
             self.reset(effective_time)
             self.last_effective_time = effective_time
             self.previous_playback_time = playback_time
@@ -397,38 +621,66 @@ class MidiScheduler:
             self.last_effective_time = effective_time
             self.previous_playback_time = playback_time
             # Find starting index for immediate start
-            times = [cue.get("time", 0) for cue in self.schedule]
-            self._next_cue_index = bisect.bisect_left(times, effective_time)
+            self._next_cue_index = bisect.bisect_left(self._cue_times, effective_time)
             return
 
-        # Process cues from the current pointer
-        while self._next_cue_index < len(self.schedule):
-            cue = self.schedule[self._next_cue_index]
-            cue_time = cue.get("time", 0)
-            
-            if cue_time <= effective_time:
-                # Trigger cue
-                cue_type = cue.get("type")
-                if not cue_type:
-                    velocity = cue.get("velocity", 0)
-                    cue_type = "note_on" if velocity > 0 else "note_off"
-
-                cue_id = f"{cue_time}_{cue_type}_{cue.get('note', 0)}_{cue.get('channel', 1)}"
-
-                if cue_id not in self.triggered_cues:
-                    self.midi_manager.send_cue_message(cue)
-                    self.triggered_cues.add(cue_id)
-                    # Only log if specifically debugging; otherwise too noisy
-                    # log_info(f"MIDI at {cue_time}s: {cue_type}", component="midi")
-                
-                self._next_cue_index += 1
-            else:
-                # Cues are sorted, so we can stop here
-                break
+        # Fire everything between the pointer and the last cue now due
+        first_due = self._next_cue_index
+        due_end = bisect.bisect_right(self._cue_times, effective_time, first_due)
+        # Advance before sending so a failing send can't re-fire earlier cues
+        self._next_cue_index = due_end
+        self._triggered_count += due_end - first_due
+        if due_end - first_due == 1:
+            self.midi_manager.send_compiled(self._cue_messages[first_due])
+        elif due_end > first_due:
+            self.midi_manager.send_compiled_batch(self._cue_messages[first_due:due_end])
 
         self.last_effective_time = effective_time
         self.previous_playback_time = playback_time
 
+    def seconds_until_next_cue(self, current_time: float) -> float:
+        """How long the caller may sleep before process_cues() has work to do.
+
+        Lets the driving loop sleep until the next cue (or the loop wrap)
+        instead of polling. Capped at MAX_IDLE_WAIT.
+        """
+        if (
+            not self.is_running
+            or not self.schedule
+            or current_time is None
+            or not isinstance(current_time, (int, float))
+        ):
+            return self.MAX_IDLE_WAIT
+        if self.last_effective_time is None:
+            return 0.0  # first tick still has to seed the cue pointer
+
+        if self.video_duration is not None and self.video_duration > 0:
+            effective_time = current_time % self.video_duration
+        else:
+            effective_time = current_time
+
+        if self._next_cue_index < len(self._cue_times):
+            wait = self._cue_times[self._next_cue_index] - effective_time
+        elif self.video_duration is not None and self.video_duration > 0:
+            wait = self.video_duration - effective_time  # wake for the loop wrap
+        else:
+            wait = self.MAX_IDLE_WAIT
+
+        return max(0.0, min(wait, self.MAX_IDLE_WAIT))
+
+    def next_wait(self, current_time: float) -> float:
+        """seconds_until_next_cue() for a loop that sleeps on it directly.
+
+        Sleeps longer than twice REANCHOR_MARGIN wake REANCHOR_MARGIN early:
+        the position re-read then leaves a few-ms final wait, so timer
+        oversleep and media drift accrued over a long wait don't land on
+        the cue.
+        """
+        wait = self.seconds_until_next_cue(current_time)
+        if wait > 2 * self.REANCHOR_MARGIN:
+            return wait - self.REANCHOR_MARGIN
+        return wait
+
     def get_current_cues(
         self, current_time: float, window: float = 0.5
     ) -> List[Dict[str, Any]]:
@@ -440,12 +692,9 @@ class MidiScheduler:
         # Adjust time for looping
         effective_time = self._get_loop_adjusted_time(current_time)
 
-        current_cues = []
-        for cue in self.schedule:
-            cue_time = cue.get("time", 0)
-            if abs(effective_time - cue_time) <= window:
-                current_cues.append(cue)
-        return current_cues
+        lo = bisect.bisect_left(self._cue_times, effective_time - window)
+        hi = bisect.bisect_right(self._cue_times, effective_time + window)
+        return self.schedule[lo:hi]
 
     def get_upcoming_cues(
         self, current_time: float, lookahead: float = 10.0
@@ -458,12 +707,9 @@ class MidiScheduler:
         # Adjust time for looping
         effective_time = self._get_loop_adjusted_time(current_time)
 
-        upcoming_cues = []
-        for cue in self.schedule:
-            cue_time = cue.get("time", 0)
-            if effective_time < cue_time <= effective_time + lookahead:
-                upcoming_cues.append(cue)
-        return upcoming_cues[:5]  # Limit to next 5 cues
+        lo = bisect.bisect_right(self._cue_times, effective_time)
+        hi = bisect.bisect_right(self._cue_times, effective_time + lookahead, lo)
+        return self.schedule[lo:min(hi, lo + 5)]  # Limit to next 5 cues
 
     def get_recent_cues(
         self, current_time: float, lookback: float = 5.0
@@ -473,12 +719,9 @@ class MidiScheduler:
         if current_time is None or not isinstance(current_time, (int, float)):
             return []
 
-        recent_cues = []
-        for cue in self.schedule:
-            cue_time = cue.get("time", 0)
-            if current_time - lookback <= cue_time <= current_time:
-                recent_cues.append(cue)
-        return recent_cues[-5:]  # Last 5 cues
+        lo = bisect.bisect_left(self._cue_times, current_time - lookback)
+        hi = bisect.bisect_right(self._cue_times, current_time, lo)
+        return self.schedule[max(lo, hi - 5):hi]  # Last 5 cues
 
     def _get_loop_adjusted_time(self, current_time: float) -> float:
         """Get time adjusted for looping"""
@@ -498,7 +741,7 @@ class MidiScheduler:
         """Get scheduler statistics"""
         return {
             "total_cues": len(self.schedule),
-            "triggered_cues": len(self.triggered_cues),
-            "remaining_cues": len(self.schedule) - len(self.triggered_cues),
+            "triggered_cues": self._triggered_count,
+            "remaining_cues": len(self.schedule) - self._next_cue_index,
             "loop_count": self.loop_count,
         }
@@ -5,6 +5,7 @@ import re
 import shutil
 import subprocess
 import sys
+import tempfile
 import threading
 import time
 import uuid
@@ -13,14 +14,13 @@ from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 from urllib.parse import parse_qs, urlparse, quote
-import socket
 
 # Add parent directory to path to allow importing from src
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
 from config.manager import ConfigManager
 from core.logger import enable_system_logging, log_info, log_warning, log_file_paths
-from networking.communication import CommandManager, SyncBroadcaster
+from networking.communication import CommandManager, SyncBroadcaster, decode_json, encode_json, get_local_ip
 from video.file_manager import VideoFileManager
 
 
@@ -287,9 +287,17 @@ def _run_conversion(source_path: Path, output_path: Path, target_codec: str, dev
 
     log_info(f"Convert: starting ffmpeg for {device_id} ({target_codec}), duration={duration:.1f}s", component="remote")
 
+    # stderr goes to a temp file rather than a pipe: nothing reads it while
+    # progress streams from stdout, so a full stderr pipe would stall ffmpeg.
+    # stdin is closed so ffmpeg never blocks reading interactive keys.
+    stderr_file = tempfile.TemporaryFile(mode="w+")
     try:
         proc = subprocess.Popen(
-            cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE, text=True,
+            cmd,
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=stderr_file,
+            text=True,
         )
 
         for line in proc.stdout:
@@ -306,7 +314,8 @@ def _run_conversion(source_path: Path, output_path: Path, target_codec: str, dev
         proc.wait(timeout=3600)
 
         if proc.returncode != 0:
-            stderr = proc.stderr.read()[:500] if proc.stderr else ""
+            stderr_file.seek(0)
+            stderr = stderr_file.read()[-500:]
             job.status = "error"
             job.error = f"ffmpeg failed (code {proc.returncode}): {stderr}"
             _set_conversion_job(job)
@@ -333,6 +342,8 @@ def _run_conversion(source_path: Path, output_path: Path, target_codec: str, dev
         job.error = f"Conversion failed: {e}"
         _set_conversion_job(job)
         return False
+    finally:
+        stderr_file.close()
 
 
 def update_runtime_from_config() -> None:
@@ -618,7 +629,8 @@ class RemoteHandler(BaseHTTPRequestHandler):
         self.send_response(status)
         self.send_header("Content-type", "application/json")
         self.end_headers()
-        self.wfile.write(json.dumps(payload).encode())
+        # The dashboard polls status/collaborator JSON; orjson when installed.
+        self.wfile.write(encode_json(payload))
 
     def _send_file_range(self, file_path: Path) -> None:
         file_size = file_path.stat().st_size
@@ -673,8 +685,8 @@ class RemoteHandler(BaseHTTPRequestHandler):
         if length <= 0:
             return {}
         try:
-            return json.loads(self.rfile.read(length).decode())
-        except json.JSONDecodeError:
+            return decode_json(self.rfile.read(length))
+        except (json.JSONDecodeError, UnicodeDecodeError):
             return {}
 
     def _handle_upload(self):
@@ -724,12 +736,7 @@ class RemoteHandler(BaseHTTPRequestHandler):
             if target_device_id and target_device_id != LOCAL_LEADER_ID:
                 log_info(f"Triggering automatic sync for {filename} to {target_device_id}", "remote")
 
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                try:
-                    s.connect(("8.8.8.8", 80))
-                    leader_ip = s.getsockname()[0]
-                finally:
-                    s.close()
+                leader_ip = get_local_ip()
 
                 _set_transfer_job(TransferJob(device_id=target_device_id, filename=filename, status="transferring"))
                 started_at = time.time()
@@ -843,12 +850,7 @@ class RemoteHandler(BaseHTTPRequestHandler):
                 transfer_started_at = time.time()
 
                 # Trigger file sync to the target device
-                s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-                try:
-                    s.connect(("8.8.8.8", 80))
-                    leader_ip = s.getsockname()[0]
-                finally:
-                    s.close()
+                leader_ip = get_local_ip()
 
                 command_manager.send_command(
                     {
@@ -1092,12 +1094,7 @@ class RemoteHandler(BaseHTTPRequestHandler):
                 self._send_json({"status": "error", "message": "device_id and filename required"}, status=400)
                 return
             
-            s = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
-            try:
-                s.connect(("8.8.8.8", 80))
-                leader_ip = s.getsockname()[0]
-            finally:
-                s.close()
+            leader_ip = get_local_ip()
                 
             command_manager.send_command(
                 {
@@ -1431,7 +1428,7 @@ def start_remote():
                     command_manager.send_command(start_cmd)
                     last_broadcast = time.time()
 
-                sync_packet = json.dumps(
+                sync_packet = encode_json(
                     {
                         "type": "sync",
                         "time": cluster_state.video_pos + compensation,
@@ -1442,7 +1439,7 @@ def start_remote():
                 )
                 try:
                     sync_broadcaster.sync_sock.sendto(
-                        sync_packet.encode(),
+                        sync_packet,
                         (sync_broadcaster.broadcast_ip, sync_broadcaster.sync_port),
                     )
                 except Exception as e:
@@ -116,12 +116,16 @@ class StatusDisplay:
             print(f"Average drift: {sync_stats.get('average_drift', 0):.3f}s")
 
 
+_PROGRESS_TIME_FORMAT = "{:02d}:{:02d}/{:02d}:{:02d}".format
+
+
 class ProgressDisplay:
     """Displays progress and timing information"""
 
     def __init__(self, width: int = 50):
         self.width = width
         self.last_display_time = 0
+        self._last_line = ""
 
     def show_progress(
         self, current_time: float, total_time: float, additional_info: str = ""
@@ -129,9 +133,10 @@ class ProgressDisplay:
         """Show progress bar and timing"""
         import time
 
-        if time.time() - self.last_display_time < 1.0:
+        now = time.time()
+        if now - self.last_display_time < 1.0:
             return
-        self.last_display_time = time.time()
+        self.last_display_time = now
 
         if total_time <= 0:
             percent = 0
@@ -143,24 +148,24 @@ class ProgressDisplay:
         bar = "█" * filled + "░" * (self.width - filled)
 
         # Format time
-        current_min = int(current_time // 60)
-        current_sec = int(current_time % 60)
-        total_min = int(total_time // 60)
-        total_sec = int(total_time % 60)
-
-        time_str = (
-            f"{current_min:02d}:{current_sec:02d}/{total_min:02d}:{total_sec:02d}"
-        )
+        current_min, current_sec = divmod(int(current_time), 60)
+        total_min, total_sec = divmod(int(total_time), 60)
+        time_str = _PROGRESS_TIME_FORMAT(current_min, current_sec, total_min, total_sec)
 
         # Display
         line = f"\r[{bar}] {percent:5.1f}% {time_str}"
         if additional_info:
             line += f" | {additional_info}"
 
+        # Paused or idle: the terminal already shows this exact line
+        if line == self._last_line:
+            return
+        self._last_line = line
         print(line, end="", flush=True)
 
     def clear_progress(self) -> None:
         """Clear the progress line"""
+        self._last_line = ""
         print("\r" + " " * 80 + "\r", end="", flush=True)
 
 
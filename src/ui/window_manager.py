@@ -4,6 +4,7 @@ Cross-platform window management for kSync
 Supports both X11 (wmctrl) and Wayland (wlrctl)
 """
 
+import functools
 import os
 import shutil
 import subprocess
@@ -15,6 +16,17 @@ from core.logger import log_info, log_warning, log_error
 _cursor_hider_started = False
 
 
+@functools.lru_cache(maxsize=None)
+def _tool_path(name: str) -> Optional[str]:
+    """Resolve a helper binary once per process.
+
+    wait_for_window polls list_windows every 0.5s; each poll used to walk
+    PATH with shutil.which and then again in execvp. Tools aren't installed
+    or removed under a running node, so cache the absolute path.
+    """
+    return shutil.which(name)
+
+
 def hide_mouse_cursor() -> bool:
     """Hide the mouse cursor on X11 displays using unclutter."""
     global _cursor_hider_started
@@ -48,56 +60,78 @@ def hide_mouse_cursor() -> bool:
         return False
 
 
+# Set once wlrctl has answered (see _session_is_wayland)
+_wlrctl_detected_wayland = False
+
+
+def _session_is_wayland() -> bool:
+    """Detect if we're running under Wayland.
+
+    A WindowManager is built on every video start, and without the session
+    env vars this probe forks wlrctl. Only a positive answer is cached: at
+    boot the compositor may not answer yet, and a cached "no" would pin the
+    node to X11 until restart.
+    """
+    global _wlrctl_detected_wayland
+    # Check environment variables
+    if os.environ.get("WAYLAND_DISPLAY"):
+        return True
+    if os.environ.get("XDG_SESSION_TYPE") == "wayland":
+        return True
+    if _wlrctl_detected_wayland:
+        return True
+
+    # Only check wlrctl if it actually exists to avoid Errno 2 spam
+    wlrctl = _tool_path("wlrctl")
+    if wlrctl:
+        try:
+            result = subprocess.run(
+                [wlrctl, "toplevel", "list"], 
+                capture_output=True, 
+                timeout=2
+            )
+            if result.returncode == 0:
+                _wlrctl_detected_wayland = True
+                return True
+        except Exception:
+            pass
+    
+    return False
+
+
 class WindowManager:
     """Cross-platform window manager that works with both X11 and Wayland"""
 
     def __init__(self):
         self.is_wayland = self._detect_wayland()
         self.window_tool = "wlrctl" if self.is_wayland else "wmctrl"
+        # Absolute path (or the bare name, so failures still read clearly)
+        self._tool = _tool_path(self.window_tool) or self.window_tool
         log_info(f"Window manager initialized for {'Wayland' if self.is_wayland else 'X11'} using {self.window_tool}")
 
     def _detect_wayland(self) -> bool:
         """Detect if we're running under Wayland"""
-        # Check environment variables
-        if os.environ.get("WAYLAND_DISPLAY"):
-            return True
-        if os.environ.get("XDG_SESSION_TYPE") == "wayland":
-            return True
-        
-        # Only check wlrctl if it actually exists to avoid Errno 2 spam
-        if shutil.which("wlrctl"):
-            try:
-                result = subprocess.run(
-                    ["wlrctl", "toplevel", "list"], 
-                    capture_output=True, 
-                    timeout=2
-                )
-                if result.returncode == 0:
-                    return True
-            except Exception:
-                pass
-        
-        return False
+        return _session_is_wayland()
 
     def list_windows(self) -> List[str]:
         """List all windows"""
         try:
-            if self.is_wayland and shutil.which("wlrctl"):
+            if not _tool_path(self.window_tool):
+                return [] # No window management tools available
+            if self.is_wayland:
                 result = subprocess.run(
-                    ["wlrctl", "toplevel", "list"],
+                    [self._tool, "toplevel", "list"],
                     capture_output=True,
                     text=True,
                     timeout=5
                 )
-            elif not self.is_wayland and shutil.which("wmctrl"):
+            else:
                 result = subprocess.run(
-                    ["wmctrl", "-l"],
+                    [self._tool, "-l"],
                     capture_output=True,
                     text=True,
                     timeout=5
                 )
-            else:
-                return [] # No window management tools available
             
             if result.returncode == 0:
                 return result.stdout.strip().split("\n")
@@ -165,7 +199,7 @@ class WindowManager:
         """Detect and return coordinate offset for a window"""
         try:
             result = subprocess.run(
-                ["wmctrl", "-lG"], capture_output=True, text=True, timeout=5
+                [self._tool, "-lG"], capture_output=True, text=True, timeout=5
             )
             
             if result.returncode == 0:
@@ -199,7 +233,7 @@ class WindowManager:
                 # For X11, try to get from xrandr or use defaults
                 try:
                     result = subprocess.run(
-                        ["xrandr", "--current"], 
+                        [_tool_path("xrandr") or "xrandr", "--current"], 
                         capture_output=True, 
                         text=True, 
                         timeout=5
@@ -232,7 +266,7 @@ class WindowManager:
                 # Note: wlrctl may have limited positioning support
                 # Try to focus first
                 subprocess.run(
-                    ["wlrctl", "toplevel", "focus", window_identifier],
+                    [self._tool, "toplevel", "focus", window_identifier],
                     check=False,
                     timeout=5
                 )
@@ -242,7 +276,7 @@ class WindowManager:
                 # X11 with wmctrl - try multiple approaches
                 # First, try to move the window
                 move_result = subprocess.run(
-                    ["wmctrl", "-ir", window_identifier, "-e", f"0,{x},{y},{width},{height}"],
+                    [self._tool, "-ir", window_identifier, "-e", f"0,{x},{y},{width},{height}"],
                     check=False,
                     timeout=5,
                     capture_output=True,
@@ -255,7 +289,7 @@ class WindowManager:
                     # Verify the positioning worked by checking window position
                     time.sleep(0.2)  # Give it time to move
                     verify_result = subprocess.run(
-                        ["wmctrl", "-lG"], capture_output=True, text=True, timeout=5
+                        [self._tool, "-lG"], capture_output=True, text=True, timeout=5
                     )
                     
                     if verify_result.returncode == 0:
@@ -290,7 +324,7 @@ class WindowManager:
                     
                     # First move the window
                     move_only = subprocess.run(
-                        ["wmctrl", "-ir", window_identifier, "-e", f"0,{x},{y},-1,-1"],
+                        [self._tool, "-ir", window_identifier, "-e", f"0,{x},{y},-1,-1"],
                         check=False,
                         timeout=5,
                         capture_output=True,
@@ -302,7 +336,7 @@ class WindowManager:
                         
                         # Then resize it
                         resize_only = subprocess.run(
-                            ["wmctrl", "-ir", window_identifier, "-e", f"0,-1,-1,{width},{height}"],
+                            [self._tool, "-ir", window_identifier, "-e", f"0,-1,-1,{width},{height}"],
                             check=False,
                             timeout=5,
                             capture_output=True,
@@ -328,7 +362,7 @@ class WindowManager:
         try:
             if self.is_wayland:
                 result = subprocess.run(
-                    ["wlrctl", "toplevel", "focus", window_identifier],
+                    [self._tool, "toplevel", "focus", window_identifier],
                     check=False,
                     timeout=5,
                     capture_output=True,
@@ -336,7 +370,7 @@ class WindowManager:
                 )
             else:
                 result = subprocess.run(
-                    ["wmctrl", "-ia", window_identifier],
+                    [self._tool, "-ia", window_identifier],
                     check=False,
                     timeout=5,
                     capture_output=True,
@@ -372,14 +406,14 @@ class WindowManager:
         try:
             if self.is_wayland:
                 result = subprocess.run(
-                    ["wlrctl", "toplevel", "list"],
+                    [self._tool, "toplevel", "list"],
                     capture_output=True,
                     text=True,
                     timeout=5
                 )
             else:
                 result = subprocess.run(
-                    ["wmctrl", "-lG"],
+                    [self._tool, "-lG"],
                     capture_output=True,
                     text=True,
                     timeout=5
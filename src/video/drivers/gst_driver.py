@@ -4,6 +4,7 @@ GStreamer Implementation of the VideoDriver interface.
 Provides high-performance, rate-based synchronization for Raspberry Pi.
 """
 
+import functools
 import os
 import shutil
 import subprocess
@@ -23,8 +24,27 @@ except ImportError:
 from video.driver import VideoDriver, PlayerState
 from core.logger import log_info, log_error, log_warning
 
+# Successful probes, per DISPLAY (see get_screen_resolution)
+_screen_resolutions: Dict[Optional[str], tuple[int, int]] = {}
+
+
 def get_screen_resolution() -> tuple[int, int]:
-    """Get the screen resolution of the default display on X11/Wayland"""
+    """Get the screen resolution of the default display on X11/Wayland.
+
+    Probed once per display: each probe spawns xrandr (and possibly
+    xwininfo), and crop-to-fill asks on every video load. A failed probe
+    (X not up yet) is not cached, so a later load retries.
+    """
+    display = os.environ.get("DISPLAY")
+    resolution = _screen_resolutions.get(display)
+    if resolution is None:
+        resolution = _probe_screen_resolution()
+        if resolution != (0, 0):
+            _screen_resolutions[display] = resolution
+    return resolution
+
+
+def _probe_screen_resolution() -> tuple[int, int]:
     xrandr_path = shutil.which("xrandr")
     if xrandr_path:
         try:
@@ -55,8 +75,13 @@ def get_screen_resolution() -> tuple[int, int]:
             
     return 0, 0
 
+@functools.lru_cache(maxsize=None)
 def get_pi_model() -> str:
-    """Detect the Raspberry Pi model name if running on a Pi"""
+    """Detect the Raspberry Pi model name if running on a Pi.
+
+    Cached: the board can't change under a running process, and this is
+    called for every 2s heartbeat and every discover reply.
+    """
     for path in ["/sys/firmware/devicetree/base/model", "/proc/device-tree/model"]:
         if os.path.exists(path):
             try:
@@ -89,6 +114,9 @@ class GstDriver(VideoDriver):
         self.video_path = None
         self.state = PlayerState.STOPPED
         self.current_rate = 1.0
+        # Set once the current pipeline rejects INSTANT_RATE_CHANGE (Pi 5 v4l2sl
+        # decoders do): set_speed then goes straight to the flushing fallback
+        self._instant_rate_rejected = False
         self.video_sink_name = None
         self.hardware_accel_preferred = False
         self.decoder_name = None
@@ -105,6 +133,8 @@ class GstDriver(VideoDriver):
         # Position polling
         self._cached_position = 0.0
         self._last_poll_time = 0.0
+        # Duration of the loaded file once the pipeline reports it; 0.0 = unknown
+        self._duration = 0.0
         self._stop_polling = threading.Event()
         self._poll_thread = None
 
@@ -120,10 +150,12 @@ class GstDriver(VideoDriver):
                     success, pos = self.pipeline.query_position(Gst.Format.TIME)
                     if success:
                         self._cached_position = pos / Gst.SECOND
-                        self._last_poll_time = time.time()
+                        self._last_poll_time = time.monotonic()
             except Exception:
                 pass
-            time.sleep(self.poll_interval)
+            # Wakes on stop, so _stop_polling_worker's short join succeeds
+            # and a restart can't clear the flag under a still-sleeping worker
+            self._stop_polling.wait(self.poll_interval)
 
     def _start_polling(self):
         if self._poll_thread and self._poll_thread.is_alive():
@@ -412,28 +444,41 @@ class GstDriver(VideoDriver):
 
         threading.Thread(target=window_task, daemon=True).start()
 
+    def _release_pipeline(self) -> None:
+        """Tear down the current pipeline and detach its bus watch.
+
+        The watch is a GSource on the shared main context that holds a ref
+        to the bus; left attached, every reload leaked the old bus and
+        pipeline, and with a long-lived loop it would keep dispatching the
+        old pipeline's messages.
+        """
+        if not self.pipeline:
+            return
+        try:
+            self.pipeline.get_bus().remove_signal_watch()
+        except Exception:
+            pass
+        try:
+            self.pipeline.set_state(Gst.State.NULL)
+        except Exception:
+            pass
+        self.pipeline = None
+
+    def _ensure_main_loop(self) -> None:
+        """Start the GLib MainLoop thread that dispatches bus messages, once.
+
+        Bus watches come and go with pipelines; the loop serving them does
+        not, so a video switch no longer quits, joins and respawns it.
+        """
+        if self.loop and self.loop_thread and self.loop_thread.is_alive():
+            return
+        self.loop = GLib.MainLoop()
+        self.loop_thread = threading.Thread(target=self.loop.run, daemon=True)
+        self.loop_thread.start()
+
     def load(self, video_path: str) -> bool:
-        # Clean up existing pipeline/loop if reloading
-        if self.pipeline:
-            try:
-                self.pipeline.set_state(Gst.State.NULL)
-            except Exception:
-                pass
-            self.pipeline = None
-            
-        if self.loop:
-            try:
-                self.loop.quit()
-            except Exception:
-                pass
-            self.loop = None
-            
-        if self.loop_thread:
-            try:
-                self.loop_thread.join(timeout=0.2)
-            except Exception:
-                pass
-            self.loop_thread = None
+        # Clean up the existing pipeline if reloading; the MainLoop stays
+        self._release_pipeline()
 
         if not os.path.exists(video_path):
             log_error(f"Gst: Video file not found: {video_path}")
@@ -442,9 +487,12 @@ class GstDriver(VideoDriver):
         self.video_path = video_path
         self._reprioritize_decoders()
 
-        # New pipeline: any previous netclock slaving no longer applies
+        # New pipeline: any previous netclock slaving no longer applies, and
+        # a different decoder may accept instant rate changes
         self._net_clock = None
         self._net_base_time = None
+        self._instant_rate_rejected = False
+        self._duration = 0.0
 
         # Always use playbin - it is much more robust at negotiating hardware 
         # buffers (DMABuf) than a manually constructed pipeline.
@@ -497,10 +545,7 @@ class GstDriver(VideoDriver):
         bus.add_signal_watch()
         bus.connect("message", self._on_bus_message)
 
-        # Start the GLib MainLoop in a separate thread
-        self.loop = GLib.MainLoop()
-        self.loop_thread = threading.Thread(target=self.loop.run, daemon=True)
-        self.loop_thread.start()
+        self._ensure_main_loop()
 
         log_info(f"Gst: Loaded {video_path} with pipeline '{self.pipeline_kind}'")
         return True
@@ -549,13 +594,13 @@ class GstDriver(VideoDriver):
                 Gst.SeekType.NONE, -1
             )
             self._cached_position = 0.0
-            self._last_poll_time = time.time()
+            self._last_poll_time = time.monotonic()
             log_info("Gst: Gapless loop point")
         elif t == Gst.MessageType.EOS:
             # Fallback path for hardware that doesn't support SEGMENT seeks
             log_info("Gst: End of stream reached, looping (flush fallback)...")
             self._cached_position = 0.0
-            self._last_poll_time = time.time()
+            self._last_poll_time = time.monotonic()
             self.seek(0)
         elif t == Gst.MessageType.ASYNC_DONE:
             self.is_seeking = False
@@ -614,7 +659,7 @@ class GstDriver(VideoDriver):
                         log_info("Gst: Successfully recovered playback using fakesink fallback.", component="video")
                         self.state = PlayerState.PLAYING
                         self._cached_position = 0.0
-                        self._last_poll_time = time.time()
+                        self._last_poll_time = time.monotonic()
                         self._start_polling()
                         self._enable_gapless_looping()
                         return True
@@ -653,7 +698,7 @@ class GstDriver(VideoDriver):
 
         self.state = PlayerState.PLAYING
         self._cached_position = aligned_position if aligned_position is not None else 0.0
-        self._last_poll_time = time.time() # Reset poll time to current to avoid extrapolation explosion
+        self._last_poll_time = time.monotonic() # Reset poll time to current to avoid extrapolation explosion
         self._start_polling()
 
         # Phase 3 NetTimeProvider setup for clock sync.
@@ -827,19 +872,23 @@ class GstDriver(VideoDriver):
         if abs(rate - self.current_rate) < 0.001:
             return True
 
-        # 1. Try INSTANT_RATE_CHANGE (seamless)
-        event = Gst.Event.new_seek(
-            rate,
-            Gst.Format.TIME,
-            Gst.SeekFlags.INSTANT_RATE_CHANGE,
-            Gst.SeekType.NONE, 0,
-            Gst.SeekType.NONE, -1
-        )
-        
-        if self.pipeline.send_event(event):
-            self.current_rate = rate
-            log_info(f"Gst: Playback rate adjusted to {rate:.4f} (seamless)")
-            return True
+        # 1. Try INSTANT_RATE_CHANGE (seamless), unless this pipeline has
+        # already rejected it - the round trip through every element would
+        # just fail again before the fallback
+        if not self._instant_rate_rejected:
+            event = Gst.Event.new_seek(
+                rate,
+                Gst.Format.TIME,
+                Gst.SeekFlags.INSTANT_RATE_CHANGE,
+                Gst.SeekType.NONE, 0,
+                Gst.SeekType.NONE, -1
+            )
+
+            if self.pipeline.send_event(event):
+                self.current_rate = rate
+                log_info(f"Gst: Playback rate adjusted to {rate:.4f} (seamless)")
+                return True
+            self._instant_rate_rejected = True
 
         # 2. Fallback to Flushing Seek (for hardware that rejects instant changes)
         # This is less seamless (minor flicker) but works on Pi 5.
@@ -876,7 +925,9 @@ class GstDriver(VideoDriver):
         if self._last_poll_time <= 0:
             return self._cached_position
 
-        elapsed = time.time() - self._last_poll_time
+        # Monotonic: a wall-clock step (NTP at boot on an RTC-less Pi) must
+        # not rewind the extrapolated position and re-fire MIDI cues
+        elapsed = time.monotonic() - self._last_poll_time
         # Cap extrapolation to avoid runaway values if poll thread hangs
         if elapsed > 1.0:
             return self._cached_position
@@ -891,13 +942,21 @@ class GstDriver(VideoDriver):
         return position if success else None
 
     def get_duration(self) -> float:
-        """Get total video duration in seconds."""
+        """Get total video duration in seconds.
+
+        Read on every sync tick on both nodes (leader broadcast, collaborator
+        wrap), but fixed per file: the first successful query is kept until
+        the next load().
+        """
+        if self._duration > 0:
+            return self._duration
         if not self.pipeline:
             return 0.0
-            
+
         success, duration = self.pipeline.query_duration(Gst.Format.TIME)
-        if success:
-            return duration / Gst.SECOND
+        if success and duration > 0:
+            self._duration = duration / Gst.SECOND
+            return self._duration
         return 0.0
 
     def get_pipeline_clock(self):
@@ -1052,9 +1111,11 @@ class GstDriver(VideoDriver):
 
     def cleanup(self) -> None:
         self.stop()
+        self._release_pipeline()
         if self.loop:
             self.loop.quit()
-        self.pipeline = None
+            self.loop = None
+            self.loop_thread = None
         self.decoder_candidates = []
         log_info("Gst: Cleanup complete")
 
@@ -12,15 +12,16 @@ import subprocess
 import threading
 import time
 from pathlib import Path
-from typing import Optional, List
+from typing import Iterator, Optional, List
 
 from core.logger import log_info, log_warning, log_error
+from core.mount_table import usb_mount_points
 
 
 class VideoFileManager:
     """Manages video file discovery, selection, and local caching"""
 
-    SUPPORTED_EXTENSIONS = [
+    SUPPORTED_EXTENSIONS = frozenset({
         ".mp4",
         ".avi",
         ".mov",
@@ -29,7 +30,7 @@ class VideoFileManager:
         ".flv",
         ".webm",
         ".m4v",
-    ]
+    })
 
     def __init__(
         self,
@@ -65,6 +66,11 @@ class VideoFileManager:
         self.metadata_cache_file = os.path.join(self.cache_dir, "metadata_cache.json")
         self._metadata_cache = self._load_metadata_cache()
 
+        # find_video_file memo: (file_to_find, allow_any) -> (usb_mounts, path).
+        # Reused while the path still exists and the USB mount set is unchanged
+        # (a newly inserted stick must still win over a local fallback).
+        self._resolved_paths: dict = {}
+
         self._cached_video_list = []
         self._last_scan_time = 0.0
         self._scan_interval = 10.0  # scan at most every 10 seconds
@@ -107,12 +113,32 @@ class VideoFileManager:
 
     def find_video_file(self, target_file: Optional[str] = None, use_cache: bool = False) -> Optional[str]:
         """Find video file with intelligent fallback and optional caching"""
-        search_log = []
-        found_path = None
-        
         # Use the provided target_file or fall back to the configured one
         file_to_find = target_file if target_file else self.configured_file
 
+        usb_mounts = self._get_usb_mount_points()
+        memo_key = (file_to_find, not target_file)
+        memo = self._resolved_paths.get(memo_key)
+        if memo and memo[0] == usb_mounts and os.path.exists(memo[1]):
+            found_path = memo[1]
+        else:
+            found_path = self._search_video_file(file_to_find, target_file, usb_mounts)
+            if not found_path:
+                self._resolved_paths.pop(memo_key, None)
+                return None
+            self._resolved_paths[memo_key] = (usb_mounts, found_path)
+
+        # Apply Caching if requested and file is external
+        if use_cache and self._is_external_path(found_path):
+            return self.cache_file(found_path)
+
+        return found_path
+
+    def _search_video_file(self, file_to_find: str, target_file: Optional[str], usb_mounts: List[str]) -> Optional[str]:
+        """Walk the search order for find_video_file (uncached)."""
+        search_log = []
+        found_path = None
+
         # Step 1: Look for file on the specific USB mount point
         if self.usb_mount_point:
             usb_path = os.path.join(self.usb_mount_point, file_to_find)
@@ -122,7 +148,6 @@ class VideoFileManager:
 
         # Step 2: Look for file on all USB drives
         if not found_path:
-            usb_mounts = self._get_usb_mount_points()
             if usb_mounts:
                 for mount_point in usb_mounts:
                     usb_path = os.path.join(mount_point, file_to_find)
@@ -160,7 +185,6 @@ class VideoFileManager:
 
         # Step 6: Find any video file on all USB drives (only if no target specified)
         if not found_path and not target_file:
-            usb_mounts = self._get_usb_mount_points()
             if usb_mounts:
                 for mount_point in usb_mounts:
                     video_path = self._find_any_video_in_directory(mount_point)
@@ -184,10 +208,6 @@ class VideoFileManager:
                 log_error(f"  Checked: {log}", "video")
             return None
 
-        # Apply Caching if requested and file is external
-        if use_cache and self._is_external_path(found_path):
-            return self.cache_file(found_path)
-
         return found_path
 
     def cache_file(self, source_path: str) -> str:
@@ -601,50 +621,38 @@ class VideoFileManager:
         return deleted
 
     def _get_usb_mount_points(self) -> List[str]:
-        """Get all USB mount points"""
-        mount_points = []
-        try:
-            mount_result = subprocess.run(["mount"], capture_output=True, text=True)
-            if mount_result.returncode == 0:
-                for line in mount_result.stdout.split("\n"):
-                    if "/media/" in line and (
-                        "usb" in line.lower() or "sd" in line or "mmc" in line
-                    ):
-                        parts = line.split(" on ")
-                        if len(parts) >= 2:
-                            mount_point = parts[1].split(" type ")[0]
-                            if os.path.exists(mount_point) and os.path.isdir(
-                                mount_point
-                            ):
-                                mount_points.append(mount_point)
-        except Exception as e:
-            pass  # Ignore USB mount errors
-        return mount_points
+        """Get all USB mount points
+
+        This runs on every find_video_file call (to validate the resolve
+        memo); the shared MountTable only rescans after a mount change.
+        """
+        return usb_mount_points()
 
     def _find_any_video_in_directory(self, directory: str) -> Optional[str]:
-        """Find any video file in a directory (case-insensitive)"""
-        vids = self._get_videos_in_directory(directory)
-        return vids[0] if vids else None
+        """Find any video file in a directory (case-insensitive).
+
+        Stops at the first match instead of listing the whole directory.
+        """
+        return next(self._iter_videos_in_directory(directory), None)
 
     def _get_videos_in_directory(self, directory: str) -> List[str]:
         """Get all video files in a directory (case-insensitive)"""
+        return list(self._iter_videos_in_directory(directory))
+
+    def _iter_videos_in_directory(self, directory: str) -> Iterator[str]:
         if not os.path.exists(directory):
-            return []
+            return
 
-        videos = []
         try:
-            # Get all files and filter manually for case-insensitivity
-            all_files = os.listdir(directory)
-            for filename in all_files:
-                file_path = os.path.join(directory, filename)
-                if os.path.isfile(file_path):
-                    ext = os.path.splitext(filename)[1].lower()
-                    if ext in self.SUPPORTED_EXTENSIONS:
-                        videos.append(file_path)
+            # One scandir pass: the extension test is a set lookup and
+            # is_file() comes from the dirent, so non-videos cost no stat.
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    ext = os.path.splitext(entry.name)[1].lower()
+                    if ext in self.SUPPORTED_EXTENSIONS and entry.is_file():
+                        yield os.path.join(directory, entry.name)
         except Exception as e:
             log_error(f"Error scanning directory {directory}: {e}", "video")
-            
-        return videos
 
     @staticmethod
     def validate_video_file(video_path: str) -> bool:
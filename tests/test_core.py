@@ -4,10 +4,12 @@ Sanity tests for kSync core logic.
 Verifies that drivers and state management work as expected.
 """
 
-import unittest
+import os
 import sys
+import tempfile
+import unittest
 from pathlib import Path
-from unittest.mock import MagicMock
+from unittest.mock import MagicMock, patch
 
 # Add src to path
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
@@ -19,6 +21,11 @@ sys.modules['gi.repository'] = MagicMock()
 from video import get_video_driver
 from video.driver import PlayerState
 from core import SystemState
+from core.mount_table import MountTable
+from core.node_common import elevate_thread_priority, pin_thread_to_cpu
+from core.rolling_median import RollingMedian
+from core.timeline_fit import TimelineFit
+from ui.interface import ProgressDisplay
 
 class TestkSync(unittest.TestCase):
     def test_video_driver_factory(self):
@@ -44,5 +51,136 @@ class TestkSync(unittest.TestCase):
         state.stop_session()
         self.assertFalse(state.is_running)
 
+    def test_realtime_priority_is_best_effort(self):
+        """Unprivileged nodes must keep running on SCHED_OTHER."""
+        with patch("os.sched_setscheduler", create=True, side_effect=PermissionError("EPERM")):
+            self.assertFalse(elevate_thread_priority(component="test"))
+        with patch("os.sched_setscheduler", create=True) as setter:
+            self.assertTrue(elevate_thread_priority(component="test", priority=5))
+        self.assertEqual(setter.call_args.args[2].sched_priority, 5)
+
+    def test_cpu_pinning_counts_back_from_the_last_core(self):
+        with patch("os.sched_getaffinity", create=True, return_value={0, 1, 2, 3}), \
+                patch("os.sched_setaffinity", create=True) as setter:
+            self.assertEqual(pin_thread_to_cpu("test", 0), 3)
+            self.assertEqual(pin_thread_to_cpu("test", 1), 2)
+        self.assertEqual([c.args for c in setter.call_args_list], [(0, {3}), (0, {2})])
+
+    def test_cpu_pinning_skips_small_machines_and_refusals(self):
+        with patch("os.sched_getaffinity", create=True, return_value={0, 1}), \
+                patch("os.sched_setaffinity", create=True) as setter:
+            self.assertIsNone(pin_thread_to_cpu("test", 0))
+        setter.assert_not_called()
+        with patch("os.sched_getaffinity", create=True, return_value={0, 1, 2, 3}), \
+                patch("os.sched_setaffinity", create=True, side_effect=PermissionError("EPERM")):
+            self.assertIsNone(pin_thread_to_cpu("test", 0))
+
+class TestRollingMedian(unittest.TestCase):
+    def test_matches_statistics_median_over_the_window(self):
+        import random
+        import statistics
+
+        rng = random.Random(7)
+        samples = [rng.uniform(-0.2, 0.2) for _ in range(200)]
+        for window in (1, 3, 4):
+            rolling = RollingMedian(window)
+            for i, value in enumerate(samples):
+                rolling.add(value)
+                expected = statistics.median(samples[max(0, i + 1 - window):i + 1])
+                self.assertEqual(rolling.median(), expected)
+            self.assertEqual(len(rolling), window)
+
+    def test_clear_empties_the_window(self):
+        rolling = RollingMedian(3)
+        rolling.add(1.0)
+        rolling.clear()
+        self.assertEqual(len(rolling), 0)
+        with self.assertRaises(ValueError):
+            rolling.median()
+
+        for value in (5.0, 1.0, 3.0, 9.0):
+            rolling.add(value)
+        self.assertEqual(rolling.median(), 3.0)  # window is 1.0, 3.0, 9.0
+
+
+class TestTimelineFit(unittest.TestCase):
+    def test_no_prediction_during_warmup(self):
+        fit = TimelineFit()
+        fit.add(100.0, 5.0)
+        fit.add(100.1, 5.1)
+        self.assertIsNone(fit.predict(100.2))
+
+    def test_fit_averages_out_jitter_and_skew(self):
+        """Alternating ±8ms jitter on a 1.001x leader clock must not leak through."""
+        fit = TimelineFit()
+        for i in range(32):
+            local = 1000.0 + i * 0.1
+            jitter = 0.008 if i % 2 else -0.008
+            fit.add(local, 10.0 + (local - 1000.0) * 1.001 + jitter)
+        expected = 10.0 + 3.2 * 1.001
+        self.assertAlmostEqual(fit.predict(1003.2), expected, delta=0.002)
+
+    def test_jump_restarts_fit(self):
+        fit = TimelineFit()
+        for i in range(10):
+            fit.add(i * 0.1, 50.0 + i * 0.1)
+        fit.add(1.0, 0.0)  # loop wrap
+        self.assertIsNone(fit.predict(1.1))
+
+class TestProgressDisplay(unittest.TestCase):
+    def test_unchanged_line_is_not_redrawn(self):
+        """A paused timeline must not reprint the same progress line every second."""
+        display = ProgressDisplay()
+        with patch("builtins.print") as printed, patch("time.time", side_effect=[10.0, 12.0, 14.0]):
+            display.show_progress(5.0, 60.0)
+            display.show_progress(5.0, 60.0)
+            display.show_progress(6.0, 60.0)
+        self.assertEqual(printed.call_count, 2)
+
+    def test_time_is_formatted_as_minutes_and_seconds(self):
+        display = ProgressDisplay(width=10)
+        with patch("builtins.print") as printed, patch("time.time", return_value=10.0):
+            display.show_progress(125.7, 3600.0)
+        self.assertIn("02:05/60:00", printed.call_args.args[0])
+
+class TestMountTable(unittest.TestCase):
+    def test_reads_kernel_mount_table_without_forking(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            stick = os.path.join(tmp, "media", "pi", "MY STICK")
+            os.makedirs(stick)
+            table = os.path.join(tmp, "mounts")
+            escaped = stick.replace(" ", "\\040")
+            with open(table, "w") as f:
+                f.write("/dev/mmcblk0p2 / ext4 rw,noatime 0 0\n")
+                f.write(f"/dev/sda1 {escaped} vfat rw,relatime 0 0\n")
+                f.write("/dev/sdb1 /media/pi/GONE vfat rw 0 0\n")
+
+            with patch("core.mount_table.subprocess.run") as run:
+                self.assertEqual(MountTable(table).usb_mount_points(), [stick])
+            run.assert_not_called()
+
+    @unittest.skipUnless(os.path.exists("/proc/self/mounts"), "needs procfs")
+    def test_mount_set_is_reused_until_the_table_changes(self):
+        mounts = MountTable()
+        self.addCleanup(mounts.close)
+        with patch.object(mounts, "_scan", return_value=["/media/pi/USB"]) as scan:
+            self.assertEqual(mounts.usb_mount_points(), ["/media/pi/USB"])
+            self.assertEqual(mounts.usb_mount_points(), ["/media/pi/USB"])
+            self.assertEqual(scan.call_count, 1)
+
+            with patch.object(mounts, "_changed", return_value=True):
+                mounts.usb_mount_points()
+            self.assertEqual(scan.call_count, 2)
+
+    def test_config_and_video_discovery_share_one_table(self):
+        from config.manager import USBConfigLoader
+        from video.file_manager import VideoFileManager
+
+        with patch("core.mount_table._shared_table") as table:
+            table.usb_mount_points.return_value = ["/media/pi/USB"]
+            self.assertEqual(USBConfigLoader.find_usb_mount_points(), ["/media/pi/USB"])
+            self.assertEqual(VideoFileManager._get_usb_mount_points(MagicMock()), ["/media/pi/USB"])
+        self.assertEqual(table.usb_mount_points.call_count, 2)
+
 if __name__ == "__main__":
     unittest.main()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Tests for video file discovery."""
+
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+from unittest.mock import patch
+
+
+sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
+
+from video.file_manager import VideoFileManager
+
+
+class TestFindVideoFile(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.media = self.tmp.name
+        with patch.object(VideoFileManager, "trigger_background_scan"):
+            self.manager = VideoFileManager("show.mp4", cache_dir=os.path.join(self.media, ".cache"))
+        self.manager.fallback_sources = [self.media]
+        mounts = patch.object(VideoFileManager, "_get_usb_mount_points", return_value=[])
+        mounts.start()
+        self.addCleanup(mounts.stop)
+        self.addCleanup(self.tmp.cleanup)
+
+    def _touch(self, name):
+        path = os.path.join(self.media, name)
+        Path(path).touch()
+        return path
+
+    def test_directory_scan_filters_by_extension(self):
+        self._touch("a.MP4")
+        self._touch("notes.txt")
+        os.mkdir(os.path.join(self.media, "folder.mkv"))
+
+        videos = self.manager._get_videos_in_directory(self.media)
+
+        self.assertEqual(videos, [os.path.join(self.media, "a.MP4")])
+
+    def test_any_video_stops_at_the_first_match(self):
+        self._touch("a.mp4")
+        self._touch("b.mov")
+        seen = []
+        real_scandir = os.scandir
+
+        class CountingScandir:
+            def __init__(self, path):
+                self._it = real_scandir(path)
+
+            def __enter__(self):
+                return self
+
+            def __exit__(self, *exc):
+                self._it.close()
+
+            def __iter__(self):
+                for entry in self._it:
+                    seen.append(entry.name)
+                    yield entry
+
+        with patch("os.scandir", CountingScandir):
+            found = self.manager._find_any_video_in_directory(self.media)
+
+        self.assertIn(os.path.basename(found), ("a.mp4", "b.mov"))
+        self.assertEqual(len(seen), 1)
+
+    def test_resolved_path_is_reused_until_it_disappears(self):
+        path = self._touch("show.mp4")
+        with patch("os.getcwd", return_value=self.media):
+            self.assertEqual(os.path.abspath(self.manager.find_video_file()), path)
+
+            with patch.object(self.manager, "_search_video_file") as search:
+                self.assertEqual(os.path.abspath(self.manager.find_video_file()), path)
+                search.assert_not_called()
+
+            os.remove(path)
+            fallback = self._touch("other.mov")
+            self.assertEqual(os.path.abspath(self.manager.find_video_file()), fallback)
+
+
+class TestUsbConfigLoaderDiscovery(unittest.TestCase):
+    def test_video_and_schedule_names_match_case_insensitively(self):
+        from config.manager import USBConfigLoader
+
+        with tempfile.TemporaryDirectory() as stick:
+            os.makedirs(os.path.join(stick, "show"))
+            open(os.path.join(stick, "notes.txt"), "w").close()
+            open(os.path.join(stick, "show", "Intro.MOV"), "w").close()
+            open(os.path.join(stick, "show", "Schedule.JSON"), "w").close()
+
+            with patch.object(USBConfigLoader, "find_usb_mount_points", return_value=[stick]):
+                video = USBConfigLoader.find_video_on_usb()
+                schedule = USBConfigLoader.find_schedule_on_usb()
+
+        self.assertEqual(video, {"mount_point": stick, "video_file": "Intro.MOV"})
+        self.assertEqual(schedule, os.path.join(stick, "show", "Schedule.JSON"))
+
+
+if __name__ == "__main__":
+    unittest.main()
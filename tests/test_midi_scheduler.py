@@ -0,0 +1,229 @@
+#!/usr/bin/env python3
+"""Tests for MIDI cue scheduling."""
+
+import sys
+import unittest
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+
+ROOT = Path(__file__).parent.parent
+sys.path.insert(0, str(ROOT / "src"))
+
+from protocols.midi_handler import MidiManager, MidiScheduler, MockMidiOut, SerialMidiOut
+
+
+def make_scheduler(schedule, duration=None):
+    manager = MagicMock()
+    manager.use_serial = False
+    manager.compile_cue.side_effect = lambda cue: cue["note"]
+    scheduler = MidiScheduler(manager)
+    scheduler.load_schedule(schedule)
+    scheduler.start_playback(0.0, duration)
+    return scheduler, manager
+
+
+class TestMidiScheduler(unittest.TestCase):
+    def test_cues_fire_once_in_order(self):
+        scheduler, manager = make_scheduler([
+            {"time": 2.0, "note": 62, "velocity": 100},
+            {"time": 1.0, "note": 61, "velocity": 100},
+        ])
+        for t in (0.0, 0.5, 1.1, 1.2, 2.5, 3.0):
+            scheduler.process_cues(t)
+
+        notes = [c.args[0] for c in manager.send_compiled.call_args_list]
+        self.assertEqual(notes, [61, 62])
+
+    def test_reloading_an_unchanged_schedule_skips_recompiling(self):
+        schedule = [{"time": 1.0, "note": 61}, {"time": 2.0, "note": 62}]
+        scheduler, manager = make_scheduler(schedule)
+        scheduler.load_schedule([dict(cue) for cue in schedule])
+        self.assertEqual(manager.compile_cue.call_count, 2)
+
+        scheduler.load_schedule(schedule + [{"time": 3.0, "note": 63}])
+        self.assertEqual(manager.compile_cue.call_count, 5)
+        self.assertEqual(list(scheduler._cue_times), [1.0, 2.0, 3.0])
+
+    def test_fitted_clock_stepping_back_does_not_refire_a_cue(self):
+        scheduler, manager = make_scheduler([{"time": 1.0, "note": 61, "velocity": 100}])
+        # A refit pulls the clock back 5ms across the cue it just fired
+        for t in (0.0, 0.998, 1.002, 0.997, 1.001, 1.02):
+            scheduler.process_cues(t)
+
+        notes = [c.args[0] for c in manager.send_compiled.call_args_list]
+        self.assertEqual(notes, [61])
+
+    def test_real_seek_back_replays_the_cue(self):
+        scheduler, manager = make_scheduler([{"time": 1.0, "note": 61, "velocity": 100}])
+        for t in (0.0, 1.1, 0.6, 0.7, 1.05):
+            scheduler.process_cues(t)
+
+        notes = [c.args[0] for c in manager.send_compiled.call_args_list]
+        self.assertEqual(notes, [61, 61])
+
+    def test_editing_the_loaded_schedule_in_place_recompiles(self):
+        schedule = [{"time": 1.0, "note": 61}, {"time": 2.0, "note": 62}]
+        scheduler, manager = make_scheduler(schedule)
+        schedule[1]["note"] = 64
+        scheduler.load_schedule(schedule)
+        self.assertEqual(scheduler._cue_messages, [61, 64])
+
+        schedule.append({"time": 3.0, "note": 63})
+        scheduler.load_schedule(schedule)
+        self.assertEqual(scheduler._cue_messages, [61, 64, 63])
+
+    def test_cues_sharing_a_timestamp_all_fire(self):
+        cue = {"time": 1.0, "note": 60, "velocity": 100}
+        scheduler, manager = make_scheduler([cue, dict(cue)])
+        scheduler.process_cues(0.0)
+        scheduler.process_cues(1.5)
+
+        manager.send_compiled_batch.assert_called_once_with([60, 60])
+        self.assertEqual(scheduler.get_stats()["remaining_cues"], 0)
+
+    def test_seconds_until_next_cue_tracks_pointer(self):
+        scheduler, _ = make_scheduler([{"time": 0.3, "note": 60, "velocity": 1}])
+        # First tick seeds the pointer, so the loop must not sleep before it
+        self.assertEqual(scheduler.seconds_until_next_cue(0.0), 0.0)
+        scheduler.process_cues(0.0)
+        self.assertAlmostEqual(scheduler.seconds_until_next_cue(0.1), 0.2)
+        # Nothing due for a long time: capped so seeks/stops are noticed
+        scheduler.process_cues(0.4)
+        self.assertEqual(scheduler.seconds_until_next_cue(0.4), MidiScheduler.MAX_IDLE_WAIT)
+
+    def test_seconds_until_next_cue_wakes_for_loop_wrap(self):
+        scheduler, _ = make_scheduler([{"time": 0.1, "note": 60, "velocity": 1}], duration=10.0)
+        scheduler.process_cues(0.0)
+        scheduler.process_cues(9.9)
+        self.assertAlmostEqual(scheduler.seconds_until_next_cue(9.9), 0.1)
+
+    def test_next_wait_reanchors_before_the_cue(self):
+        scheduler, _ = make_scheduler([{"time": 0.3, "note": 60, "velocity": 1}])
+        self.assertEqual(scheduler.next_wait(0.0), 0.0)
+        scheduler.process_cues(0.0)
+        margin = MidiScheduler.REANCHOR_MARGIN
+        # Far from the cue: wake early, then the final approach is exact
+        self.assertAlmostEqual(scheduler.next_wait(0.1), 0.2 - margin)
+        self.assertAlmostEqual(scheduler.next_wait(0.3 - margin), margin)
+
+    def test_ticks_never_walk_the_cue_dicts(self):
+        class NoScan(list):
+            def __iter__(self):
+                raise AssertionError("process_cues scanned the schedule")
+
+        scheduler, manager = make_scheduler([{"time": t * 0.5, "note": t} for t in range(1000)])
+        scheduler.schedule = NoScan(scheduler.schedule)
+        for t in (0.0, 0.1, 0.2, 100.2, 100.3):
+            scheduler.process_cues(t)
+
+        notes = [c.args[0] for c in manager.send_compiled.call_args_list]
+        self.assertEqual(notes, [0])
+        self.assertEqual(manager.send_compiled_batch.call_args.args[0], list(range(1, 201)))
+
+    def test_cue_window_queries_use_time_index(self):
+        scheduler, _ = make_scheduler([{"time": float(t), "note": t} for t in range(20)])
+        notes = lambda cues: [c["note"] for c in cues]
+        self.assertEqual(notes(scheduler.get_current_cues(5.0, window=1.0)), [4, 5, 6])
+        self.assertEqual(notes(scheduler.get_upcoming_cues(5.0)), [6, 7, 8, 9, 10])
+        self.assertEqual(notes(scheduler.get_upcoming_cues(5.0, lookahead=2.0)), [6, 7])
+        self.assertEqual(notes(scheduler.get_recent_cues(5.0)), [1, 2, 3, 4, 5])
+        self.assertEqual(notes(scheduler.get_recent_cues(5.0, lookback=1.0)), [4, 5])
+
+
+class TestSerialMidiOut(unittest.TestCase):
+    @patch("protocols.midi_handler.time.sleep")
+    def test_open_port_requests_low_latency_and_tolerates_refusal(self, _sleep):
+        fake_serial = MagicMock()
+        port = fake_serial.Serial.return_value
+        port.set_low_latency_mode.side_effect = ValueError("ttyACM")
+        with patch("protocols.midi_handler.SERIAL_AVAILABLE", True), \
+                patch("protocols.midi_handler.serial", fake_serial, create=True):
+            out = SerialMidiOut(port="/dev/ttyUSB0")
+            out.open_port()
+
+        port.set_low_latency_mode.assert_called_once_with(True)
+        self.assertIs(out.ser, port)
+
+
+class TestMockMidiOut(unittest.TestCase):
+    def test_mock_sends_are_silent_unless_verbose_logging(self):
+        out = MockMidiOut()
+        with patch("builtins.print") as printed, \
+                patch("protocols.midi_handler.info_logging_enabled", return_value=False), \
+                patch("protocols.midi_handler.log_info") as logged:
+            for _ in range(32):
+                out.send_message(bytes([0xB0, 123, 0]))
+        printed.assert_not_called()
+        logged.assert_not_called()
+
+
+class TestCueBatching(unittest.TestCase):
+    def _manager(self, use_serial):
+        manager = MidiManager.__new__(MidiManager)
+        manager.use_serial = use_serial
+        manager.midi_out = MagicMock()
+        manager._out_queue = None
+        manager._writer_thread = None
+        return manager
+
+    def test_serial_batch_keeps_final_level_per_note(self):
+        manager = self._manager(use_serial=True)
+        manager.send_compiled_batch([manager.compile_cue(cue) for cue in (
+            {"note": 60, "velocity": 100},
+            {"note": 61, "velocity": 50},
+            {"note": 60, "velocity": 0},
+            {"type": "control_change", "control": 7, "value": 1},
+        )])
+        manager.midi_out.write_raw.assert_called_once_with(b"61 50\n60 0\n")
+
+    def test_midi_port_batch_sends_every_event(self):
+        manager = self._manager(use_serial=False)
+        manager.send_compiled_batch([manager.compile_cue(cue) for cue in (
+            {"note": 60, "velocity": 100, "channel": 2},
+            {"note": 60, "velocity": 0},
+            {"type": "control_change", "control": 7, "value": 300},
+        )])
+        sent = [c.args[0] for c in manager.midi_out.send_message.call_args_list]
+        self.assertEqual(sent, [bytes([0x91, 60, 100]), bytes([0x80, 60, 0]), bytes([0xB0, 7, 127])])
+
+    def test_midi_port_batch_continues_after_a_failed_send(self):
+        manager = self._manager(use_serial=False)
+        manager.midi_out.send_message.side_effect = [OSError("port gone"), None]
+        with patch("builtins.print"):
+            manager.send_compiled_batch([bytes([0x90, 60, 100]), None, bytes([0x90, 61, 100])])
+        sent = [c.args[0] for c in manager.midi_out.send_message.call_args_list]
+        self.assertEqual(sent, [bytes([0x90, 60, 100]), bytes([0x90, 61, 100])])
+
+    def test_writer_thread_sends_in_order_and_drains_on_cleanup(self):
+        manager = self._manager(use_serial=False)
+        manager.start_writer()
+        self.addCleanup(manager._stop_writer)
+        writer = manager._writer_thread
+
+        manager.send_compiled(bytes([0x90, 60, 100]))
+        manager.send_compiled_batch([bytes([0x90, 61, 100]), None])
+        manager.all_notes_off()
+        manager.cleanup()
+
+        self.assertFalse(writer.is_alive())
+        sent = [c.args[0] for c in manager.midi_out.send_message.call_args_list]
+        self.assertEqual(sent[:2], [bytes([0x90, 60, 100]), bytes([0x90, 61, 100])])
+        self.assertEqual(len(sent), 2 + 32)
+        manager.midi_out.close_port.assert_called_once()
+
+    def test_stop_playback_silences_outputs(self):
+        serial_manager = self._manager(use_serial=True)
+        MidiScheduler(serial_manager).stop_playback()
+        written = serial_manager.midi_out.write_raw.call_args.args[0]
+        self.assertEqual(written.splitlines(), [f"{n} 0".encode() for n in range(60, 72)])
+
+        port_manager = self._manager(use_serial=False)
+        MidiScheduler(port_manager).stop_playback()
+        sent = [c.args[0] for c in port_manager.midi_out.send_message.call_args_list]
+        self.assertEqual(len(sent), 32)
+        self.assertIn(bytes([0xBF, 123, 0]), sent)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -8,11 +8,26 @@ import threading
 import time
 import unittest
 from pathlib import Path
+from unittest.mock import MagicMock, patch
 
 
 sys.path.insert(0, str(Path(__file__).parent.parent / "src"))
 
-from networking.communication import CommandListener, CommandManager
+from networking.communication import (
+    CONTROL_RCVBUF_BYTES,
+    LOW_DELAY_TOS,
+    SYNC_RCVBUF_BYTES,
+    CommandListener,
+    CommandManager,
+    SyncBroadcaster,
+    SyncReceiver,
+    UdpListenerLoop,
+    decode_json,
+    encode_json,
+    pack_sync_frame,
+    unpack_sync_frame,
+)
+from networking.recvmmsg import RECVMMSG_AVAILABLE, RecvMmsgBatch
 
 
 class TestCommandListener(unittest.TestCase):
@@ -63,6 +78,401 @@ class TestCommandListener(unittest.TestCase):
             listener.stop_listening()
 
 
+class TestUdpListenerLoop(unittest.TestCase):
+    def test_one_loop_serves_sync_and_commands(self):
+        """Collaborator sync + command sockets share a single selector thread."""
+        loop = UdpListenerLoop(select_timeout=0.1)
+        sync_seen = threading.Event()
+        command_seen = threading.Event()
+        receiver = SyncReceiver(sync_port=0, sync_callback=lambda *args: sync_seen.set())
+        listener = CommandListener(control_port=0)
+        listener.register_callback(lambda _msg, _addr: command_seen.set())
+
+        receiver.start_listening(loop)
+        listener.start_listening(loop)
+        loop.start()
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            sync_port = receiver.sync_sock.getsockname()[1]
+            control_port = listener.control_sock.getsockname()[1]
+            sender.sendto(json.dumps({"type": "sync", "time": 1.0}).encode(), ("127.0.0.1", sync_port))
+            sender.sendto(json.dumps({"type": "stop"}).encode(), ("127.0.0.1", control_port))
+
+            self.assertTrue(sync_seen.wait(timeout=1.0))
+            self.assertTrue(command_seen.wait(timeout=1.0))
+        finally:
+            sender.close()
+            receiver.stop_listening()
+            listener.stop_listening()
+            loop.stop()
+
+
+    def test_stop_wakes_an_idle_loop(self):
+        loop = UdpListenerLoop()
+        loop.start()
+        thread = loop._thread
+        started = time.monotonic()
+        loop.stop()
+        self.assertFalse(thread.is_alive())
+        self.assertLess(time.monotonic() - started, 0.5)
+
+
+class TestSyncReceiverDrain(unittest.TestCase):
+    def test_wakeup_drains_to_newest_packet(self):
+        seen = []
+        receiver = SyncReceiver(sync_port=0, sync_callback=lambda t, *_rest: seen.append(t))
+        receiver.is_running = True
+        receiver.setup_socket()
+        receiver.sync_sock.setblocking(False)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            port = receiver.sync_sock.getsockname()[1]
+            for t in (1.0, 2.0, 3.0):
+                sender.sendto(json.dumps({"type": "sync", "time": t}).encode(), ("127.0.0.1", port))
+            time.sleep(0.05)
+
+            receiver._on_readable()
+
+            self.assertEqual(seen, [3.0])
+            self.assertGreater(receiver.last_sync_time, 0)
+        finally:
+            sender.close()
+            receiver.stop_listening()
+
+    def test_newest_packet_survives_buffer_reuse(self):
+        seen = []
+        receiver = SyncReceiver(sync_port=0, sync_callback=lambda t, _rx, leader, *_rest: seen.append((t, leader)))
+        receiver.is_running = True
+        receiver.setup_socket()
+        receiver.sync_sock.setblocking(False)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            port = receiver.sync_sock.getsockname()[1]
+            sender.sendto(json.dumps({"type": "sync", "time": 1.0, "leader_id": "x" * 200}).encode(), ("127.0.0.1", port))
+            sender.sendto(pack_sync_frame(2.5, "lead", "media", None, 0.0, 0.0), ("127.0.0.1", port))
+            time.sleep(0.05)
+
+            receiver._on_readable()
+
+            self.assertEqual(seen, [(2.5, "lead")])
+        finally:
+            sender.close()
+            receiver.stop_listening()
+
+
+    def test_per_datagram_fallback_drains_to_newest_packet(self):
+        seen = []
+        receiver = SyncReceiver(sync_port=0, sync_callback=lambda t, *_rest: seen.append(t))
+        receiver.is_running = True
+        receiver.setup_socket()
+        receiver._batch = None  # as on platforms without recvmmsg
+        receiver.sync_sock.setblocking(False)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            port = receiver.sync_sock.getsockname()[1]
+            for t in (1.0, 2.0, 3.0):
+                sender.sendto(json.dumps({"type": "sync", "time": t}).encode(), ("127.0.0.1", port))
+            time.sleep(0.05)
+
+            receiver._on_readable()
+
+            self.assertEqual(seen, [3.0])
+        finally:
+            sender.close()
+            receiver.stop_listening()
+
+
+    @unittest.skipUnless(RECVMMSG_AVAILABLE, "recvmmsg is Linux-only")
+    def test_listener_thread_drains_without_toggling_blocking_mode(self):
+        seen = []
+        receiver = SyncReceiver(sync_port=0, sync_callback=lambda t, *_rest: seen.append(t))
+        receiver.setup_socket()
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            port = receiver.sync_sock.getsockname()[1]
+            for t in (1.0, 2.0, 3.0):
+                sender.sendto(json.dumps({"type": "sync", "time": t}).encode(), ("127.0.0.1", port))
+            time.sleep(0.05)
+
+            with patch.object(socket.socket, "setblocking", autospec=True) as setblocking:
+                receiver.start_listening()
+                deadline = time.time() + 2.0
+                while not seen and time.time() < deadline:
+                    time.sleep(0.01)
+
+            self.assertEqual(seen, [3.0])
+            setblocking.assert_not_called()
+        finally:
+            sender.close()
+            receiver.stop_listening()
+
+
+@unittest.skipUnless(RECVMMSG_AVAILABLE, "recvmmsg is Linux-only")
+class TestRecvMmsgBatch(unittest.TestCase):
+    def setUp(self):
+        self.rx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.rx.bind(("127.0.0.1", 0))
+        self.tx = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self.tx.bind(("127.0.0.1", 0))
+
+    def tearDown(self):
+        self.rx.close()
+        self.tx.close()
+
+    def test_one_call_returns_every_queued_datagram(self):
+        batch = RecvMmsgBatch(self.rx, count=8, bufsize=64)
+        for payload in (b"one", b"two", b"three"):
+            self.tx.sendto(payload, self.rx.getsockname())
+        time.sleep(0.05)
+
+        self.assertEqual(batch.recv(), 3)
+        self.assertEqual([batch.payload(i) for i in range(3)], [b"one", b"two", b"three"])
+        self.assertEqual(batch.address(2), self.tx.getsockname())
+        with self.assertRaises(BlockingIOError):
+            batch.recv()
+
+    def test_slots_are_reusable_across_calls(self):
+        batch = RecvMmsgBatch(self.rx, count=2, bufsize=64)
+        for payload in (b"a", b"b", b"c"):
+            self.tx.sendto(payload, self.rx.getsockname())
+        time.sleep(0.05)
+
+        self.assertEqual(batch.recv(), 2)
+        self.assertEqual(batch.recv(), 1)
+        self.assertEqual(batch.payload(0), b"c")
+        self.assertEqual(batch.address(0), self.tx.getsockname())
+
+
+class TestSyncPrefixFilter(unittest.TestCase):
+    def test_only_type_first_sync_json_is_parsed(self):
+        seen = []
+        receiver = SyncReceiver(sync_port=0, sync_callback=lambda t, *_rest: seen.append(t))
+        with patch("networking.communication.decode_json", wraps=decode_json) as decode:
+            receiver._dispatch_packet(b'{"type": "heartbeat", "time": 1.0}', None, 1.0)
+            receiver._dispatch_packet(b'{"type":"sync","time":2.0}', None, 1.0)
+            receiver._dispatch_packet(json.dumps({"type": "sync", "time": 3.0}).encode(), None, 1.0)
+
+        self.assertEqual(seen, [2.0, 3.0])
+        self.assertEqual(decode.call_count, 2)
+
+
+class TestCommandListenerDrain(unittest.TestCase):
+    def test_wakeup_dispatches_every_queued_command(self):
+        listener = CommandListener(control_port=0)
+        seen = []
+        listener.register_callback(lambda msg, _addr: seen.append(msg["n"]))
+        listener.is_running = True
+        listener.setup_socket()
+        listener.control_sock.setblocking(False)
+        sender = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        try:
+            port = listener.control_sock.getsockname()[1]
+            for n in range(3):
+                sender.sendto(json.dumps({"type": "stop", "n": n}).encode(), ("127.0.0.1", port))
+            time.sleep(0.05)
+
+            listener._on_readable()
+
+            self.assertEqual(seen, [0, 1, 2])
+        finally:
+            sender.close()
+            listener.stop_listening()
+
+
+    def test_non_json_datagrams_skip_the_decoder(self):
+        listener = CommandListener(control_port=0)
+        seen = []
+        listener.register_callback(lambda msg, _addr: seen.append(msg["type"]))
+        with patch("networking.communication.decode_json", wraps=decode_json) as decode:
+            listener._dispatch_datagram(memoryview(b"KS\x01\x00binary-sync-frame"), None)
+            listener._dispatch_datagram(b"M-SEARCH * HTTP/1.1", None)
+            listener._dispatch_datagram(memoryview(b'{"type": "stop"}'), None)
+
+        self.assertEqual(seen, ["stop"])
+        self.assertEqual(decode.call_count, 1)
+
+
+class TestCommandSocketBuffer(unittest.TestCase):
+    def test_command_socket_asks_for_a_larger_receive_buffer(self):
+        probe = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        default = probe.getsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF)
+        probe.close()
+
+        listener = CommandListener(control_port=0)
+        with patch.object(socket.socket, "setsockopt", autospec=True) as setsockopt:
+            listener.setup_socket()
+        listener.control_sock.close()
+
+        options = [c.args[-3:] for c in setsockopt.call_args_list]
+        self.assertIn((socket.SOL_SOCKET, socket.SO_RCVBUF, CONTROL_RCVBUF_BYTES), options)
+        self.assertGreater(CONTROL_RCVBUF_BYTES, default)
+
+    def test_leader_command_socket_asks_for_a_larger_receive_buffer(self):
+        manager = CommandManager(control_port=0)
+        with patch.object(socket.socket, "setsockopt", autospec=True) as setsockopt:
+            manager.setup_socket()
+        manager.control_sock.close()
+
+        options = [c.args[-3:] for c in setsockopt.call_args_list]
+        self.assertIn((socket.SOL_SOCKET, socket.SO_RCVBUF, CONTROL_RCVBUF_BYTES), options)
+
+    def test_send_sockets_are_marked_low_delay(self):
+        broadcaster = SyncBroadcaster(sync_port=0, broadcast_ip="127.0.0.1")
+        broadcaster.setup_socket()
+        self.addCleanup(broadcaster.sync_sock.close)
+        manager = CommandManager(control_port=0, broadcast_ip="127.0.0.1")
+        manager._ensure_send_socket()
+        self.addCleanup(manager.control_sock.close)
+
+        for sock in (broadcaster.sync_sock, manager.control_sock):
+            self.assertEqual(sock.getsockopt(socket.IPPROTO_IP, socket.IP_TOS), LOW_DELAY_TOS)
+
+    def test_sync_socket_sizes_its_buffer_before_bind(self):
+        receiver = SyncReceiver(sync_port=0)
+        with patch.object(socket.socket, "setsockopt", autospec=True) as setsockopt, \
+             patch.object(socket.socket, "bind", autospec=True) as bind:
+            bind.side_effect = lambda *_args: self.assertIn(
+                (socket.SOL_SOCKET, socket.SO_RCVBUF, SYNC_RCVBUF_BYTES),
+                [c.args[-3:] for c in setsockopt.call_args_list],
+            )
+            receiver.setup_socket()
+        receiver.sync_sock.close()
+        bind.assert_called_once()
+
+
+class TestHeartbeatEncoding(unittest.TestCase):
+    def test_heartbeat_payload_is_complete_json(self):
+        listener = CommandListener(control_port=0)
+        sent = []
+        listener._send_payload = lambda payload, host=None: sent.append(payload)
+
+        for deviation in (0.012, -0.5):
+            listener.send_heartbeat(
+                "pi-2", "running", hard_seeks=3, video_file='a "b".mp4',
+                is_optimized=True, video_driver="gstreamer",
+                sync_deviation=deviation, playback_rate=1.01, pi_model="Pi 5",
+            )
+
+        self.assertEqual(json.loads(sent[1]), {
+            "type": "heartbeat", "device_id": "pi-2", "status": "running",
+            "hard_seeks": 3, "video_file": 'a "b".mp4', "is_optimized": True,
+            "video_driver": "gstreamer", "sync_deviation": -0.5,
+            "playback_rate": 1.01, "pi_model": "Pi 5",
+        })
+
+    def test_heartbeat_splice_is_valid_with_either_encoder(self):
+        for orjson_enabled in (True, False):
+            listener = CommandListener(control_port=0)
+            sent = []
+            listener._send_payload = lambda payload, host=None: sent.append(payload)
+            with patch("networking.communication.ORJSON_AVAILABLE", orjson_enabled):
+                listener.send_heartbeat("pi-2", "running", sync_deviation=0.25)
+            self.assertIsInstance(sent[0], bytes)
+            msg = json.loads(sent[0])
+            self.assertEqual((msg["type"], msg["sync_deviation"]), ("heartbeat", 0.25))
+
+    def test_unchanged_heartbeat_reuses_payload(self):
+        listener = CommandListener(control_port=0)
+        sent = []
+        listener._send_payload = lambda payload, host=None: sent.append(payload)
+
+        listener.send_heartbeat("pi-2", "ready")
+        listener.send_heartbeat("pi-2", "ready")
+        listener.send_heartbeat("pi-2", "ready", video_file="b.mp4")
+
+        self.assertIs(sent[0], sent[1])
+        self.assertEqual(json.loads(sent[2])["video_file"], "b.mp4")
+
+
+    def test_offline_broadcast_address_opens_no_probe_socket(self):
+        from networking import communication
+
+        with patch("networking.communication.get_local_ip", side_effect=OSError("unreachable")), \
+                patch("networking.communication.socket.socket") as sock:
+            self.assertEqual(communication._get_broadcast_address(), "255.255.255.255")
+        sock.assert_not_called()
+
+
+class TestJsonSyncTemplate(unittest.TestCase):
+    def test_template_matches_json_dumps(self):
+        broadcaster = SyncBroadcaster(sync_port=0, broadcast_ip="127.0.0.1")
+        for args in (
+            (12.345678901234, "media", 60.0, 1700000000.123456, 1700000000.1),
+            (12.4, "media", 60.0, 1700000000.2, 1700000000.19),
+            (0.1, "wall", None, 1700000001.0, 1700000001.0),
+            (5, "wall", None, 1700000002.0, 1700000002.0),
+        ):
+            current_time, source, duration, sent_at, read_time = args
+            expected = json.dumps({
+                "type": "sync", "time": current_time, "leader_id": broadcaster.leader_id,
+                "source": source, "duration": duration, "sent_at": sent_at,
+                "position_read_time": read_time,
+            }).encode()
+            self.assertEqual(broadcaster._encode_json_tick(*args), expected)
+
+
+class TestDecodeJson(unittest.TestCase):
+    def test_stdlib_nan_payload_still_decodes(self):
+        """json.dumps emits NaN, which orjson alone would reject."""
+        msg = decode_json(json.dumps({"type": "heartbeat", "sync_deviation": float("nan")}).encode())
+        self.assertEqual(msg["type"], "heartbeat")
+        self.assertNotEqual(msg["sync_deviation"], msg["sync_deviation"])
+
+    def test_invalid_payload_raises_json_error(self):
+        with self.assertRaises(json.JSONDecodeError):
+            decode_json(b"{not json")
+
+    def test_buffer_view_decodes_with_and_without_orjson(self):
+        buf = bytearray(64)
+        payload = b'{"type": "stop", "n": 1}'
+        buf[:len(payload)] = payload
+        view = memoryview(buf)[:len(payload)]
+        self.assertEqual(decode_json(view), {"type": "stop", "n": 1})
+        with patch("networking.communication.ORJSON_AVAILABLE", False):
+            self.assertEqual(decode_json(view), {"type": "stop", "n": 1})
+
+    def test_encoded_commands_round_trip(self):
+        command = {"type": "start", "position": 12.5, "sync_settings": {"kp": 2.0}, "target": None}
+        payload = encode_json(command)
+        self.assertIsInstance(payload, bytes)
+        self.assertEqual(decode_json(payload), command)
+        # Non-str keys are out of orjson's default set; json.dumps covers them
+        self.assertEqual(decode_json(encode_json({"type": "x", 1: "a"})), {"type": "x", "1": "a"})
+
+
+class TestBinarySyncFrame(unittest.TestCase):
+    def test_round_trip(self):
+        frame = pack_sync_frame(12.5, "leader-001", "media", 300.0, 1000.25, 1000.0)
+        self.assertEqual(
+            unpack_sync_frame(frame),
+            (12.5, "leader-001", "media", 300.0, 1000.25, 1000.0),
+        )
+        no_duration = unpack_sync_frame(pack_sync_frame(1.0, "l", "wall", None, 2.0, 2.0))
+        self.assertEqual(no_duration[2:4], ("wall", None))
+
+    def test_leader_id_is_encoded_and_decoded_once(self):
+        frames = [pack_sync_frame(float(i), "leader-cache", "media", None, 1.0, 1.0) for i in range(3)]
+        decoded = [unpack_sync_frame(frame)[1] for frame in frames]
+        self.assertEqual(decoded, ["leader-cache"] * 3)
+        self.assertIs(decoded[0], decoded[2])
+
+    def test_broadcaster_defaults_to_json(self):
+        self.assertEqual(SyncBroadcaster(sync_port=0, broadcast_ip="127.0.0.1").wire_format, "json")
+
+    def test_json_is_not_a_frame(self):
+        self.assertIsNone(unpack_sync_frame(b'{"type": "sync", "time": 1.0}'))
+
+    def test_receiver_accepts_both_formats(self):
+        seen = []
+        receiver = SyncReceiver(sync_port=0, sync_callback=lambda *args: seen.append(args))
+        receiver._dispatch_packet(pack_sync_frame(3.0, "L", "media", None, 5.0, 4.0), ("10.0.0.1", 5005), 6.0)
+        receiver._dispatch_packet(json.dumps({"type": "sync", "time": 3.0, "leader_id": "L", "source": "media",
+                                              "sent_at": 5.0, "position_read_time": 4.0}).encode(),
+                                  ("10.0.0.1", 5005), 6.0)
+        self.assertEqual(seen[0], seen[1])
+        self.assertEqual(seen[0], (3.0, 6.0, "L", 5.0, "media", 4.0, "10.0.0.1"))
+
+
 class TestCommandManagerLatency(unittest.TestCase):
     def test_rtt_is_recorded_from_pong_only(self):
         manager = CommandManager()
@@ -83,6 +493,32 @@ class TestCommandManagerLatency(unittest.TestCase):
         self.assertGreater(manager.get_average_rtt(), 0.0)
         self.assertLess(manager.get_average_rtt(), 0.5)
 
+    def test_latency_update_uses_the_fastest_recent_probe(self):
+        manager = CommandManager()
+        manager._rtt_samples["collab-1"] = [0.012, 0.090]
+        manager._ping_sent_at["collab-1"] = time.monotonic() - 0.040
+        with patch.object(manager, "send_command") as send:
+            manager._handle_default_message({"type": "pong", "device_id": "collab-1"}, ("127.0.0.1", 5006))
+
+        message = send.call_args.args[0]
+        self.assertEqual(message["type"], "latency_update")
+        self.assertAlmostEqual(message["latency"], 0.006)
+        self.assertEqual(send.call_args.kwargs, {"target_pi": "collab-1"})
+
+    def test_commands_sent_mid_probe_keep_the_ping_stamp(self):
+        manager = CommandManager()
+        manager.collaborators["collab-1"] = {"ip": "127.0.0.1"}
+        manager.control_sock = MagicMock()
+        manager._ping_sent_at["collab-1"] = time.monotonic() - 0.05
+
+        manager.send_command({"type": "stop"})
+        manager.send_command({"type": "stop"}, target_pi="collab-1")
+        with patch.object(manager, "send_command"):
+            manager._handle_default_message({"type": "pong", "device_id": "collab-1"}, ("127.0.0.1", 5006))
+
+        self.assertGreaterEqual(manager.get_device_last_rtt("collab-1"), 0.05)
+        self.assertLess(manager.get_device_last_rtt("collab-1"), 0.5)
+
 
 class TestKernelTimestampExtraction(unittest.TestCase):
     def test_extract_timestamp_ns(self):
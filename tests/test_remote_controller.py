@@ -1,5 +1,6 @@
 #!/usr/bin/env python3
 
+import io
 import sys
 import unittest
 from pathlib import Path
@@ -125,6 +126,18 @@ class TestRemoteController(unittest.TestCase):
 
         self.assertEqual(call_order, ["start_listening", "start_latency_probing"])
 
+    def test_read_json_body_drops_undecodable_payloads(self):
+        handler = controller.RemoteHandler.__new__(controller.RemoteHandler)
+        for body, expected in (
+            (b'{"video_file": "clip.mp4"}', {"video_file": "clip.mp4"}),
+            (b"{not json", {}),
+            (b"\xff\xfe", {}),
+        ):
+            with self.subTest(body=body):
+                handler.headers = {"Content-Length": str(len(body))}
+                handler.rfile = io.BytesIO(body)
+                self.assertEqual(handler._read_json_body(), expected)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
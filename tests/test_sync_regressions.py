@@ -4,6 +4,8 @@
 import importlib
 import os
 import sys
+import threading
+import time
 import unittest
 from pathlib import Path
 from types import SimpleNamespace
@@ -22,6 +24,8 @@ sys.modules.setdefault("gi.repository", MagicMock())
 
 import collaborator
 import leader
+from core.rolling_median import RollingMedian
+from core.timeline_fit import TimelineFit
 from video.drivers import gst_driver
 from ui import window_manager
 
@@ -57,6 +61,83 @@ class TestUnifiedConfigPersistence(unittest.TestCase):
             self.assertEqual(parsed.get("KITCHENSYNC", "sync_mode"), "udp")
             self.assertEqual(parsed.get("KITCHENSYNC", "role"), "leader")
 
+    def test_update_local_config_skips_unchanged_write(self):
+        import tempfile
+        from config.manager import ConfigManager
+
+        cm = ConfigManager.__new__(ConfigManager)
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "ksync.ini")
+            cm.update_local_config(path, {"role": "leader", "device_id": "pi-1"})
+            os.utime(path, ns=(1, 1))
+
+            cm.update_local_config(path, {"role": "leader", "device_id": "pi-1"})
+            self.assertEqual(os.stat(path).st_mtime_ns, 1)
+
+            cm.update_local_config(path, {"device_id": "pi-2"})
+            self.assertNotEqual(os.stat(path).st_mtime_ns, 1)
+
+    def test_reads_come_from_flattened_snapshot(self):
+        """get() serves a [KITCHENSYNC]-over-[DEFAULT] snapshot that tracks
+        live edits; '%' in values is literal (no interpolation)."""
+        import tempfile
+        from config.manager import ConfigManager, USBConfigLoader
+
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "ksync.ini")
+            with open(path, "w") as f:
+                f.write(
+                    "[DEFAULT]\nsync_mode = netclock\n\n"
+                    "[KITCHENSYNC]\nrole = leader\nkp = 0.3\nhotspot_password = 50%off!\n"
+                )
+            with patch.object(USBConfigLoader, "find_config_on_usb", return_value=None):
+                cm = ConfigManager(path)
+
+            self.assertEqual(cm.sync_mode, "netclock")
+            self.assertEqual(cm.kp, 0.3)
+            self.assertEqual(cm.get("hotspot_password"), "50%off!")
+
+            cm.set_param("kp", 0.7)
+            self.assertEqual(cm.kp, 0.7)
+
+    def test_numeric_keys_are_cast_once_on_load(self):
+        import tempfile
+        from config import manager
+
+        with tempfile.TemporaryDirectory() as td:
+            path = os.path.join(td, "ksync.ini")
+            with open(path, "w") as f:
+                f.write("[KITCHENSYNC]\nrole = leader\ntick_interval = 0.1\nmax_samples = 7\n"
+                        "max_drift = 2\nkp = fast\n")
+            with patch.object(manager.USBConfigLoader, "find_config_on_usb", return_value=None):
+                cfg = manager.ConfigManager(path)
+                self.assertEqual((cfg.tick_interval, cfg.max_samples), (0.1, 7))
+                self.assertEqual(cfg._typed["max_samples"], 7)
+                self.assertEqual(cfg.kp, 2.0)  # unparseable: typed getter falls back to its default
+                # get() still serves the text as written, so a save keeps it
+                self.assertEqual(cfg.get("max_drift"), "2")
+                cfg.clean_and_save_config(path, {"tick_interval": "0.2"})
+                with open(path) as f:
+                    saved = f.read()
+        self.assertIn("max_drift = 2\n", saved)
+
+
+class TestHardwareDeviceId(unittest.TestCase):
+    def test_default_device_id_reads_cpuinfo_once(self):
+        from unittest.mock import mock_open
+        from config import manager
+
+        manager._hardware_id.cache_clear()
+        self.addCleanup(manager._hardware_id.cache_clear)
+        cm = manager.ConfigManager.__new__(manager.ConfigManager)
+        cm._values = {"device_id": "pi-001"}
+        cpuinfo = mock_open(read_data="Hardware\t: BCM2835\nSerial\t\t: 10000000abcdef12\n")
+        with patch("builtins.open", cpuinfo):
+            ids = [cm.device_id for _ in range(5)]
+
+        self.assertEqual(ids, ["pi-cdef12"] * 5)
+        cpuinfo.assert_called_once_with("/proc/cpuinfo", "r")
+
 
 class TestLeaderConfigTargeting(unittest.TestCase):
     """Broadcast config updates addressed to a collaborator must never be
@@ -128,6 +209,7 @@ class TestGstDriverSetSpeed(unittest.TestCase):
             driver.pipeline.send_event.return_value = True
             driver.pipeline.get_state.return_value = (None, 3, None) # State.PLAYING is 4, PAUSED is 3. Mocking success and PAUSED.
             driver.current_rate = 1.0
+            driver._instant_rate_rejected = False
 
             success = driver.set_speed(1.02)
 
@@ -147,6 +229,33 @@ class TestGstDriverSetSpeed(unittest.TestCase):
             gst_driver.Gst = original_gst
             gst_driver.GST_AVAILABLE = original_available
 
+    def test_rejected_instant_rate_change_is_not_retried(self):
+        fake_gst = SimpleNamespace(
+            SECOND=1_000_000_000,
+            Format=SimpleNamespace(TIME="time"),
+            SeekFlags=SimpleNamespace(INSTANT_RATE_CHANGE=4, FLUSH=1, ACCURATE=2),
+            SeekType=SimpleNamespace(NONE="none", SET="set"),
+            Event=SimpleNamespace(new_seek=MagicMock(return_value=object())),
+            State=SimpleNamespace(PAUSED=3, PLAYING=4),
+        )
+        with patch.object(gst_driver, "Gst", fake_gst):
+            driver = gst_driver.GstDriver.__new__(gst_driver.GstDriver)
+            driver.pipeline = MagicMock()
+            driver.pipeline.send_event.return_value = False
+            driver.pipeline.seek.return_value = True
+            driver.current_rate = 1.0
+            driver._instant_rate_rejected = False
+            driver.debug_mode = False
+            driver._is_ready = lambda *args, **kwargs: True
+            driver.get_position = lambda: 5.0
+
+            self.assertTrue(driver.set_speed(1.02))
+            self.assertTrue(driver.set_speed(1.01))
+
+        driver.pipeline.send_event.assert_called_once()
+        self.assertEqual(driver.pipeline.seek.call_count, 2)
+        self.assertEqual(driver.current_rate, 1.01)
+
     def test_preferred_sink_names_prioritize_x11_acceleration(self):
         driver = gst_driver.GstDriver.__new__(gst_driver.GstDriver)
 
@@ -296,7 +405,7 @@ class TestCollaboratorLoopHandling(unittest.TestCase):
             video_player=video_player,
             config=SimpleNamespace(),  # no sync_mode attr -> defaults to udp
             debug_deviation_mode=False,
-            deviation_samples=[-0.10, -0.10],
+            deviation_samples=RollingMedian(3),
             max_samples=3,
             startup_sync_count=3,
             FAST_SYNC_THRESHOLD=3,
@@ -308,6 +417,8 @@ class TestCollaboratorLoopHandling(unittest.TestCase):
             max_rate=1.2,
             _log_deviation=MagicMock(),
         )
+        dummy.deviation_samples.add(-0.10)
+        dummy.deviation_samples.add(-0.10)
         dummy._normalize_loop_time = lambda media_time: collaborator.CollaboratorPi._normalize_loop_time(dummy, media_time)
         dummy._normalize_loop_deviation = lambda video_pos, leader_time: collaborator.CollaboratorPi._normalize_loop_deviation(dummy, video_pos, leader_time)
 
@@ -318,6 +429,64 @@ class TestCollaboratorLoopHandling(unittest.TestCase):
         self.assertAlmostEqual(video_player.set_speed.call_args.args[0], 1.01)
 
 
+class TestScreenResolution(unittest.TestCase):
+    def setUp(self):
+        gst_driver._screen_resolutions.clear()
+        self.addCleanup(gst_driver._screen_resolutions.clear)
+
+    def test_resolution_is_probed_once_per_display(self):
+        with patch.dict(os.environ, {"DISPLAY": ":0"}), \
+             patch.object(gst_driver, "_probe_screen_resolution", return_value=(1920, 1080)) as probe:
+            self.assertEqual(gst_driver.get_screen_resolution(), (1920, 1080))
+            self.assertEqual(gst_driver.get_screen_resolution(), (1920, 1080))
+        probe.assert_called_once_with()
+
+    def test_failed_probe_is_retried(self):
+        with patch.dict(os.environ, {"DISPLAY": ":0"}), \
+             patch.object(gst_driver, "_probe_screen_resolution", side_effect=[(0, 0), (1280, 720)]):
+            self.assertEqual(gst_driver.get_screen_resolution(), (0, 0))
+            self.assertEqual(gst_driver.get_screen_resolution(), (1280, 720))
+
+
+class TestCollaboratorMidiClock(unittest.TestCase):
+    def _dummy(self):
+        dummy = SimpleNamespace(_leader_fit=TimelineFit(), _midi_anchor=None)
+        dummy._midi_clock = lambda now: collaborator.CollaboratorPi._midi_clock(dummy, now)
+        return dummy
+
+    def test_falls_back_to_the_newest_tick_until_the_fit_warms_up(self):
+        dummy = self._dummy()
+        self.assertIsNone(dummy._midi_clock(100.0))
+
+        dummy._midi_anchor = (100.0, 5.0)
+        self.assertAlmostEqual(dummy._midi_clock(100.25), 5.25)
+
+        for i in range(TimelineFit.MIN_SAMPLES):
+            dummy._leader_fit.add(100.0 + i * 0.1, 10.0 + i * 0.1)
+        self.assertAlmostEqual(dummy._midi_clock(101.0), 11.0)
+
+    def test_cues_fire_while_the_sync_thread_is_blocked(self):
+        scheduler = MagicMock()
+        scheduler.MAX_IDLE_WAIT = 0.25
+        scheduler.next_wait.return_value = 0.005
+        fired = threading.Event()
+        scheduler.process_cues.side_effect = lambda _t: fired.set()
+        dummy = self._dummy()
+        dummy.midi_scheduler = scheduler
+        dummy._stop_sync_thread = threading.Event()
+        dummy._midi_anchor = (time.time(), 1.0)
+
+        with patch.object(collaborator, "elevate_thread_priority"):
+            thread = threading.Thread(target=collaborator.CollaboratorPi._midi_cue_loop, args=(dummy,))
+            thread.start()
+            try:
+                self.assertTrue(fired.wait(timeout=1.0))
+            finally:
+                dummy._stop_sync_thread.set()
+                thread.join(timeout=1.0)
+        self.assertFalse(thread.is_alive())
+
+
 class TestGstDriverLooping(unittest.TestCase):
     def test_eos_resets_cached_position_before_seek(self):
         original_gst = gst_driver.Gst
@@ -341,6 +510,93 @@ class TestGstDriverLooping(unittest.TestCase):
             gst_driver.GST_AVAILABLE = original_available
 
 
+class TestGstDriverReload(unittest.TestCase):
+    def test_reload_detaches_old_bus_and_keeps_one_main_loop(self):
+        loop_started = threading.Event()
+        release = threading.Event()
+
+        class FakeLoop:
+            def run(self):
+                loop_started.set()
+                release.wait(1.0)
+
+            def quit(self):
+                release.set()
+
+        fake_glib = SimpleNamespace(MainLoop=MagicMock(side_effect=FakeLoop))
+        fake_gst = SimpleNamespace(State=SimpleNamespace(NULL="null"))
+        with patch.object(gst_driver, "Gst", fake_gst, create=True), \
+                patch.object(gst_driver, "GLib", fake_glib, create=True):
+            driver = gst_driver.GstDriver.__new__(gst_driver.GstDriver)
+            driver.pipeline = None
+            driver.loop = None
+            driver.loop_thread = None
+
+            driver._ensure_main_loop()
+            self.assertTrue(loop_started.wait(1.0))
+            first_thread = driver.loop_thread
+
+            old_pipeline = MagicMock()
+            driver.pipeline = old_pipeline
+            driver._release_pipeline()
+            driver._ensure_main_loop()
+
+            old_pipeline.get_bus.return_value.remove_signal_watch.assert_called_once()
+            old_pipeline.set_state.assert_called_once_with("null")
+            self.assertIsNone(driver.pipeline)
+            self.assertIs(driver.loop_thread, first_thread)
+            fake_glib.MainLoop.assert_called_once()
+
+            driver.loop.quit()
+            first_thread.join(1.0)
+
+
+class TestGstDriverPosition(unittest.TestCase):
+    def test_duration_is_queried_until_known_then_cached(self):
+        fake_gst = SimpleNamespace(SECOND=1_000_000_000, Format=SimpleNamespace(TIME="time"))
+        with patch.object(gst_driver, "Gst", fake_gst, create=True):
+            driver = gst_driver.GstDriver.__new__(gst_driver.GstDriver)
+            driver.pipeline = MagicMock()
+            driver._duration = 0.0
+            driver.pipeline.query_duration.side_effect = [(False, -1), (True, 90_000_000_000)]
+
+            durations = [driver.get_duration() for _ in range(4)]
+
+        self.assertEqual(durations, [0.0, 90.0, 90.0, 90.0])
+        self.assertEqual(driver.pipeline.query_duration.call_count, 2)
+
+    def test_stopping_the_poll_worker_does_not_wait_out_the_interval(self):
+        driver = gst_driver.GstDriver.__new__(gst_driver.GstDriver)
+        driver.pipeline = None
+        driver.poll_interval = 1.0
+        driver._stop_polling = threading.Event()
+        driver._poll_thread = None
+
+        driver._start_polling()
+        worker = driver._poll_thread
+        time.sleep(0.02)
+        driver._stop_polling_worker()
+
+        self.assertFalse(worker.is_alive())
+
+    def test_wall_clock_step_does_not_rewind_position(self):
+        """Extrapolation runs on the monotonic clock: an NTP step back on the
+        leader once read as a loop and re-fired every MIDI cue."""
+        driver = gst_driver.GstDriver.__new__(gst_driver.GstDriver)
+        driver.pipeline = object()
+        driver.state = gst_driver.PlayerState.PLAYING
+        driver.is_seeking = False
+        driver.current_rate = 1.0
+        driver._cached_position = 10.0
+        driver._last_poll_time = gst_driver.time.monotonic()
+
+        with patch("time.time", return_value=0.0):
+            position = driver.get_position()
+
+        self.assertGreaterEqual(position, 10.0)
+        self.assertLess(position, 10.5)
+
+
 class TestCursorHiding(unittest.TestCase):
     def test_hide_mouse_cursor_starts_unclutter_on_x11(self):
         original_started = window_manager._cursor_hider_started
@@ -366,6 +622,23 @@ class TestCursorHiding(unittest.TestCase):
         finally:
             window_manager._cursor_hider_started = original_started
 
+    def test_session_probe_caches_only_a_wayland_answer(self):
+        self.addCleanup(setattr, window_manager, "_wlrctl_detected_wayland", False)
+        window_manager._wlrctl_detected_wayland = False
+        with patch.dict(os.environ, {"WAYLAND_DISPLAY": "", "XDG_SESSION_TYPE": ""}, clear=False):
+            with patch("ui.window_manager._tool_path", return_value="/usr/bin/wlrctl"):
+                with patch("ui.window_manager.subprocess.run") as run:
+                    # Compositor not answering yet at boot: retried next time
+                    run.return_value.returncode = 1
+                    first = window_manager.WindowManager()
+                    run.return_value.returncode = 0
+                    second = window_manager.WindowManager()
+                    third = window_manager.WindowManager()
+
+        self.assertFalse(first.is_wayland)
+        self.assertTrue(second.is_wayland and third.is_wayland)
+        self.assertEqual(run.call_count, 2)
+
 
 if __name__ == "__main__":
     unittest.main()
\ No newline at end of file
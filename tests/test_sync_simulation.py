@@ -151,6 +151,15 @@ class SyncSimulationTest(unittest.TestCase):
             print(f"Number of zero crossings (tuned kp): {crossings}")
             self.assertLessEqual(crossings, 1)
 
+    def test_sync_packet_wakes_processor(self):
+        """A stored sync tick must wake the processor loop, not wait out its poll."""
+        collab = self.get_collaborator(MockConfig())
+        self.assertFalse(collab._sync_arrived.is_set())
+
+        collab._handle_sync(1.0, 1000.0, "leader-001")
+
+        self.assertTrue(collab._sync_arrived.is_set())
+
     def test_deviation_logging(self):
         """Verify that deviation logging writes to a CSV when enabled."""
         import tempfile